@@ -47,6 +47,10 @@ class BotConfig(CommonSettings):
     timer_removal: int = 120             # Таймер для удаления сообщения бота
     ban_days: int = 1                    # Дни бана за маты
     access_cache_ttl: int = 600          # Время хранения кэша прав доступа (в секундах)
+    member_cache_ttl: int = 600          # Время хранения кэша участия в группе (в секундах)
+    member_cache_max_size: int = 10000   # Максимум пользователей в кэше участия в группе
+    user_cache_ttl: int = 600            # Время хранения кэша username/access_lvl (сбрасывается через LISTEN/NOTIFY)
+    inline_cache_time: int = 120         # cache_time ответа на inline-запрос на серверах Telegram (в секундах)
 
     # ====== Warnings ======
     limit_warnings: int = 10  # Ограничение предупреждений для бана
@@ -75,14 +79,52 @@ class CacheConfig(CommonSettings):
     anime_cache_path: str = os.path.join(BASE_DIR, "_cache", "anime_cache", "anime_cache.json")
     logger.debug(f"[CacheConfig] - Путь аниме кэша по id при инициализации -> {anime_cache_path}")
 
+    # ====== Путь к локальному SQLite-хранилищу аниме кэша (заменяет anime_cache.json) ======
+    anime_cache_db_path: str = os.path.join(BASE_DIR, "_cache", "anime_cache", "anime_cache.sqlite3")
+    logger.debug(f"[CacheConfig] - Путь SQLite-хранилища аниме кэша -> {anime_cache_db_path}")
+    anime_cache_export_chunk_size: int = 1000        # Строк за одну выборку курсора при выгрузке кэша из БД
+    anime_cache_sync_interval: int = 60              # Период дельта-синхронизации локального кэша с БД (в секундах)
+    anime_cache_sync_overlap: int = 30               # Перекрытие окна синхронизации для долгих транзакций (в секундах)
+    anime_cache_snapshot_refresh_interval: float = 2.0   # Период проверки хранилища на изменения для снимка кэша (в секундах)
+
     # ====== Путь к аниме кэшу по названию ======
     anime_cache_by_name_path: str = os.path.join(BASE_DIR, "_cache", "anime_cache", "anime_cache_by_name.json")
     logger.debug(f"[CacheConfig] - Путь аниме кэша по названию при инициализации -> {anime_cache_by_name_path}")
+    anime_cache_by_name_max_size: int = 500          # Максимум запросов в кэше по названию (LRU)
+    anime_cache_by_name_persist_delay: float = 5.0   # Задержка фонового сохранения кэша по названию (в секундах)
 
     # ====== Путь к temp ======
     temp_file_path: str = os.path.join(BASE_DIR, "_cache", "temp")
     logger.debug(f"[CacheConfig] - Путь к temp -> {temp_file_path}")
 
+    # ====== Кэш ответов KodikAPI ======
+    kodik_cache_ttl: int = 3600              # Время хранения найденного плеера (в секундах)
+    kodik_negative_cache_ttl: int = 300      # Время хранения ответа "0 результатов" (в секундах)
+    kodik_cache_max_size: int = 5000         # Максимум записей в кэше KodikAPI
+
+    # ====== Кэш собранных ответов на inline-запросы ======
+    inline_results_cache_ttl: int = 300          # Время хранения выдачи по запросу (в секундах)
+    inline_results_cache_max_size: int = 1000    # Максимум запросов в кэше выдачи
+
+    # ====== Локальный индекс по жанрам ======
+    genre_local_min_pool: int = 30      # Минимум подходящих аниме жанра в кэше, чтобы /ssag обошёлся без Shikimori
+
+    # ====== Материализованный топ по году ======
+    top_by_year_size: int = 50                      # Сколько лучших аниме года хранить
+    top_by_year_refresh_interval: int = 6 * 3600    # Период обновления текущего и прошлого года (в секундах)
+    top_by_year_past_ttl: int = 7 * 24 * 3600       # Период обновления более старых лет (в секундах)
+    top_by_year_requested_ttl: int = 30 * 24 * 3600  # Более старые годы обновляются, только если их запрашивали за этот период (в секундах)
+
+    # ====== Фоновый прогрев аниме кэша ======
+    warmer_enabled: bool = True
+    warmer_start_delay: int = 60                # Задержка первого прогона после старта (в секундах)
+    warmer_interval: int = 6 * 3600             # Период между прогонами (в секундах)
+    warmer_requests_per_minute: float = 20.0    # Темп запросов прогрева к Shikimori (0 — прогрев отключён)
+    warmer_kodik_concurrency: int = 5           # Одновременных проверок плеера в Kodik при прогреве
+    warmer_page_size: int = 50                  # Аниме на страницу
+    warmer_max_pages_per_source: int = 5        # Страниц на источник (популярные / онгоинги / текущий сезон)
+    warmer_max_new_titles: int = 300            # Бюджет: максимум новых аниме за прогон
+
     model_config = SettingsConfigDict(extra="ignore")
 
 
@@ -97,6 +139,16 @@ class WeatherApiConfig(CommonSettings):
 class ShikimoriApiConfig(CommonSettings):
     rest_url: str = "https://shikimori.one/api/characters/{id}"
     gql_url: str = "https://shikimori.one/api/graphql"
+    request_timeout: float = 15.0
+    connections_limit: int = 10
+    keepalive_timeout: float = 60.0
+    origin_concurrency: int = 5                 # Одновременных REST-запросов источника персонажа
+    rate_limit_per_second: float = 5.0          # Лимит Shikimori: 5 запросов в секунду...
+    rate_limit_burst: int = 5                   # ...с таким всплеском
+    genre_pages_per_wave: int = 3               # Параллельных страниц на волну поиска по жанру (не больше всплеска)
+    max_retries_on_429: int = 3                 # Повторов после 429/503 с Retry-After
+    backoff_base: float = 0.5                   # База экспоненциальной паузы (без Retry-After), сек.
+    backoff_max: float = 10.0
 
     user_agent: str = Field(..., alias="SHIKIMORI_HEADERS_USER_AGENT")
 
@@ -154,6 +206,10 @@ class DatabaseConfig(CommonSettings):
     cache_db_port: str = Field(..., alias="CACHE_DB_PORT")
     cache_db_name: str = Field(..., alias="CACHE_DB_NAME")
 
+    cache_invalidation_channel: str = "cache_invalidation"    # Канал LISTEN/NOTIFY для межпроцессной инвалидации
+    cache_invalidation_reconnect_delay: float = 5.0           # Пауза перед переподпиской после обрыва (в секундах)
+    message_count_flush_interval: float = 5.0                 # Период записи буфера счётчиков сообщений (в секундах)
+
     ssl_cert_path: str = str(BASE_DIR / ".dev" / "supabase-ca.crt")  # Просто путь
 
     def read_ssl_certificate(self) -> bytes:
@@ -218,6 +274,9 @@ class DeveloperConfig(CommonSettings):
 # ====== WebApp Config ======
 class WebAppConfig(CommonSettings):
     kodik_token: str = Field(..., alias="KODIK_TOKEN")                          # Kodik API токен
+    kodik_api_url: str = "https://kodikapi.com/search"                          # Эндпоинт поиска KodikAPI
+    kodik_request_timeout: float = 10.0                                         # Таймаут запроса к KodikAPI (в секундах)
+    kodik_connections_limit: int = 20                                           # Лимит соединений в пуле KodikAPI
     logger.info(f"[WebAppConfig] - Зарегистрирован")
 
     model_config = SettingsConfigDict(extra="ignore")
@@ -0,0 +1,20 @@
+import json
+
+
+class ApiResponse:
+    """
+    Ответ внешнего API, уже прочитанный из сокета.
+    Повторяет используемую часть интерфейса requests.Response: status_code, text и json().
+    """
+
+    def __init__(self, status_code: int, text: str, headers: dict | None = None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self._json = None
+
+    def json(self) -> dict:
+        # Ответ может отдаваться из кэша многократно — разбираем JSON один раз
+        if self._json is None:
+            self._json = json.loads(self.text)
+        return self._json
@@ -0,0 +1,121 @@
+import asyncio
+from typing import Optional
+
+import aiohttp
+
+from _configs.config import get_config
+from api.api_response import ApiResponse
+from _configs.log_config import logger
+from tools.ttl_cache import TTLCache
+
+
+cfg = get_config()
+
+KODIK_TOKEN = cfg.web_app_config.kodik_token
+KODIK_API_URL = cfg.web_app_config.kodik_api_url
+KODIK_REQUEST_TIMEOUT = cfg.web_app_config.kodik_request_timeout
+KODIK_CONNECTIONS_LIMIT = cfg.web_app_config.kodik_connections_limit
+
+KODIK_CACHE_TTL = cfg.cache_config.kodik_cache_ttl
+KODIK_NEGATIVE_CACHE_TTL = cfg.cache_config.kodik_negative_cache_ttl
+KODIK_CACHE_MAX_SIZE = cfg.cache_config.kodik_cache_max_size
+
+
+class KodikResponse(ApiResponse):
+    """
+    Ответ KodikAPI, уже прочитанный из сокета (status_code, text, json()).
+    """
+
+
+class KodikClient:
+    _instance = None
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+        self._cache = TTLCache(ttl=KODIK_CACHE_TTL, max_size=KODIK_CACHE_MAX_SIZE)
+
+    @classmethod
+    def get_instance(cls) -> "KodikClient":
+        """
+
+        Singleton: один клиент (и один пул соединений) на процесс — для бота и для веб-сервера.
+
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            async with self._lock:
+                if self._session is None or self._session.closed:
+                    self._session = aiohttp.ClientSession(
+                        connector=aiohttp.TCPConnector(limit=KODIK_CONNECTIONS_LIMIT, ttl_dns_cache=300),
+                        timeout=aiohttp.ClientTimeout(total=KODIK_REQUEST_TIMEOUT)
+                    )
+                    logger.info("[KodikClient] - ✅ Создана сессия KodikAPI")
+        return self._session
+
+    async def search(self,
+                     shikimori_id: Optional[str | int] = None,
+                     kinopoisk_id: Optional[str | int] = None
+                     ) -> KodikResponse:
+        """
+        Поиск по KodikAPI по shikimori_id или kinopoisk_id.
+        Успешные ответы кэшируются: найденные плееры на KODIK_CACHE_TTL, "0 результатов" на KODIK_NEGATIVE_CACHE_TTL.
+
+        :param shikimori_id: ID аниме по Shikimori.one
+        :param kinopoisk_id: ID фильма\\сериала из Кинопоиска
+        :return: KodikResponse объект
+        """
+        params = {"token": KODIK_TOKEN}
+        if shikimori_id:
+            cache_key = ("shikimori_id", str(shikimori_id))
+        elif kinopoisk_id:
+            cache_key = ("kinopoisk_id", str(kinopoisk_id))
+        else:
+            cache_key = None
+
+        if cache_key:
+            params[cache_key[0]] = cache_key[1]
+
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"[KodikClient] - Кэш-хит {cache_key}. Статистика: {self._cache.stats()}")
+                return cached
+
+        session = await self._get_session()
+        async with session.get(KODIK_API_URL, params=params) as response:
+            text = await response.text(encoding="utf-8")
+            kodik_response = KodikResponse(response.status, text)
+
+        if cache_key and kodik_response.status_code == 200:
+            try:
+                has_results = bool(kodik_response.json().get("results"))
+            except (ValueError, AttributeError):
+                return kodik_response
+
+            self._cache.set(cache_key, kodik_response, ttl=KODIK_CACHE_TTL if has_results else KODIK_NEGATIVE_CACHE_TTL)
+            logger.debug(f"[KodikClient] - Кэш-промах {cache_key}, ответ сохранён. Статистика: {self._cache.stats()}")
+
+        return kodik_response
+
+    def cache_stats(self) -> dict:
+        """
+        Счётчики кэша KodikAPI: размер, попадания, промахи и доля попаданий.
+        """
+        return self._cache.stats()
+
+    async def close(self) -> None:
+        if self._session and not self._session.closed:
+            await self._session.close()
+            logger.info("[KodikClient] - Сессия KodikAPI закрыта")
+
+
+def get_kodik_client() -> KodikClient:
+    """
+    Получение общего клиента KodikAPI
+    :return: объект KodikClient
+    """
+    return KodikClient.get_instance()
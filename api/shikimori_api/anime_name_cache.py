@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from _configs.config import get_config
+from _configs.log_config import logger
+
+
+cfg = get_config()
+
+ANIME_CACHE_BY_NAME = Path(cfg.cache_config.anime_cache_by_name_path)
+ANIME_CACHE_BY_NAME_MAX_SIZE = cfg.cache_config.anime_cache_by_name_max_size
+ANIME_CACHE_BY_NAME_PERSIST_DELAY = cfg.cache_config.anime_cache_by_name_persist_delay
+
+
+class AnimeNameCache:
+    """
+    Кэш выдачи поиска по названию: {запрос в нижнем регистре: {anime_id: anime_entry}}.
+
+    Живёт в памяти процесса: загружается с диска один раз при старте, ограничен по размеру (LRU-вытеснение),
+    на диск сбрасывается в фоне — не чаще раза в ANIME_CACHE_BY_NAME_PERSIST_DELAY секунд, в отдельном потоке.
+    """
+
+    def __init__(self, file_path: Path, max_size: int, persist_delay: float):
+        self._file_path = file_path
+        self._max_size = max_size
+        self._persist_delay = persist_delay
+        self._data: OrderedDict[str, dict] = OrderedDict()
+        self._loaded = False
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task] = None
+
+    def load(self) -> None:
+        """Однократная загрузка кэша с диска (вызывается при старте бота)."""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if not self._file_path.exists():
+            logger.info(f"[AnimeNameCache] - Файл {self._file_path} не существует, создаётся новый кэш.")
+            return
+
+        try:
+            with self._file_path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error(f"[AnimeNameCache] - Невалидный кэш в файле {self._file_path}, создаётся новый кэш. {e}")
+            return
+
+        # Файл пишется в порядке LRU: последние записи — самые свежие
+        for key, value in list(data.items())[-self._max_size:]:
+            self._data[key] = value
+
+        logger.info(f"[AnimeNameCache] - Загружено {len(self._data)} запросов из {self._file_path}")
+
+    def get(self, key: str) -> Optional[dict]:
+        if not self._loaded:
+            self.load()
+
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: dict) -> None:
+        if not self._loaded:
+            self.load()
+
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+        while len(self._data) > self._max_size:
+            self._data.popitem(last=False)
+
+        self._dirty = True
+        self._schedule_save()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # ====== Сохранение на диск ======
+    def _schedule_save(self) -> None:
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._delayed_save())
+
+    async def _delayed_save(self) -> None:
+        await asyncio.sleep(self._persist_delay)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Сбрасывает текущее состояние кэша на диск в отдельном потоке (если были изменения)."""
+        if not self._dirty:
+            return
+
+        self._dirty = False
+        snapshot = dict(self._data)
+        try:
+            await asyncio.to_thread(self._write, snapshot)
+        except Exception as e:
+            self._dirty = True
+            logger.warning(f"[AnimeNameCache] - Сохранение кэша для каруселей не прошло.\n{e}")
+        else:
+            logger.info(f"[AnimeNameCache] - Кэш сохранён: {len(snapshot)} элементов")
+
+    def _write(self, snapshot: dict) -> None:
+        self._file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._file_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self._file_path)
+
+
+anime_name_cache = AnimeNameCache(
+    ANIME_CACHE_BY_NAME,
+    max_size=ANIME_CACHE_BY_NAME_MAX_SIZE,
+    persist_delay=ANIME_CACHE_BY_NAME_PERSIST_DELAY
+)
@@ -0,0 +1,150 @@
+import asyncio
+import datetime
+
+import aiohttp
+
+from _configs.config import get_config
+from _configs.log_config import logger
+from api.shikimori_api.shikimori_client import get_shikimori_client
+from api.shikimori_api.shikimori_requests import create_anime_cache_entry
+from database.repositories import get_anime_cache_repository
+from tools.cache_tools import get_anime_cache
+
+
+cfg = get_config()
+
+WARMER_REQUESTS_PER_MINUTE = cfg.cache_config.warmer_requests_per_minute
+# Темп 0 (или меньше) означает "прогрев отключён"
+WARMER_ENABLED = cfg.cache_config.warmer_enabled and WARMER_REQUESTS_PER_MINUTE > 0
+WARMER_START_DELAY = cfg.cache_config.warmer_start_delay
+WARMER_INTERVAL = cfg.cache_config.warmer_interval
+WARMER_REQUEST_DELAY = 60 / WARMER_REQUESTS_PER_MINUTE if WARMER_REQUESTS_PER_MINUTE > 0 else 0
+WARMER_KODIK_CONCURRENCY = max(1, cfg.cache_config.warmer_kodik_concurrency)
+WARMER_PAGE_SIZE = cfg.cache_config.warmer_page_size
+WARMER_MAX_PAGES_PER_SOURCE = cfg.cache_config.warmer_max_pages_per_source
+WARMER_MAX_NEW_TITLES = cfg.cache_config.warmer_max_new_titles
+
+WARMER_QUERY = """
+query WarmAnime($order: OrderEnum, $status: AnimeStatusString, $season: SeasonString, $limit: Int, $page: Int) {
+    animes(order: $order, status: $status, season: $season, limit: $limit, page: $page, kind: "!special,!ova,!ona,!music,!pv,!cm,!tv_special") {
+        id
+        name
+        russian
+        kind
+        rating
+        score
+        episodes
+        episodesAired
+        url
+        season
+        poster {
+            originalUrl
+            mainUrl
+        }
+        genres { russian }
+        studios { name }
+        description
+    }
+}
+"""
+
+
+def current_season(today: datetime.date | None = None) -> str:
+    """Сезон в формате Shikimori: winter_2025, spring_2025... Декабрь относится к зиме следующего года."""
+    today = today or datetime.date.today()
+    if today.month == 12:
+        return f"winter_{today.year + 1}"
+    season = ("winter", "winter", "spring", "spring", "spring", "summer",
+              "summer", "summer", "fall", "fall", "fall")[today.month - 1]
+    return f"{season}_{today.year}"
+
+
+def warmer_sources() -> list[tuple[str, dict]]:
+    """Источники прогрева: (название для логов, переменные GraphQL-запроса)."""
+    return [
+        ("популярные", {"order": "popularity"}),
+        ("онгоинги", {"order": "popularity", "status": "ongoing"}),
+        ("текущий сезон", {"order": "popularity", "season": current_season()}),
+    ]
+
+
+async def warm_anime_cache() -> int:
+    """
+    Один прогон прогрева: постранично обходит источники и кладёт в anime_cache аниме, которых там ещё нет.
+    Запросы к Shikimori идут с темпом WARMER_REQUEST_DELAY, проверки плеера в Kodik — не более
+    WARMER_KODIK_CONCURRENCY одновременно. Прогон останавливается по бюджету WARMER_MAX_NEW_TITLES.
+
+    :return: количество добавленных аниме
+    """
+    repository = await get_anime_cache_repository()
+    if repository is None:
+        logger.warning("[CacheWarmer] - anime_cache_repository не инициализирован, прогрев пропущен")
+        return 0
+
+    client = get_shikimori_client()
+    known_ids = set(get_anime_cache().keys())
+    added = 0
+    kodik_semaphore = asyncio.Semaphore(WARMER_KODIK_CONCURRENCY)
+
+    async def build_entry(anime: dict) -> dict:
+        async with kodik_semaphore:
+            return await create_anime_cache_entry(anime)
+
+    for source_name, source_variables in warmer_sources():
+        for page in range(1, WARMER_MAX_PAGES_PER_SOURCE + 1):
+            if added >= WARMER_MAX_NEW_TITLES:
+                logger.info(f"[CacheWarmer] - Бюджет прогона исчерпан ({WARMER_MAX_NEW_TITLES} аниме)")
+                return added
+
+            variables = {**source_variables, "limit": WARMER_PAGE_SIZE, "page": page}
+            try:
+                response = await client.graphql(WARMER_QUERY, variables)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"[CacheWarmer] - Ошибка соединения ({source_name}, page={page}): {e}")
+                break
+
+            if response.status_code != 200:
+                logger.warning(f"[CacheWarmer] - Ошибка запроса ({source_name}, page={page}): {response.status_code}")
+                break
+
+            animes = response.json().get("data", {}).get("animes") or []
+            new_animes = [anime for anime in animes if str(anime.get("id")) not in known_ids]
+            new_animes = new_animes[:WARMER_MAX_NEW_TITLES - added]
+
+            if new_animes:
+                entries = await asyncio.gather(*(build_entry(anime) for anime in new_animes))
+                if await repository.add_anime_cache_many([(entry["id"], entry) for entry in entries]):
+                    known_ids.update(str(entry["id"]) for entry in entries)
+                    added += len(entries)
+
+            logger.debug(f"[CacheWarmer] - {source_name}, page={page}: {len(animes)} аниме, новых {len(new_animes)}")
+
+            if len(animes) < WARMER_PAGE_SIZE:
+                break
+
+            await asyncio.sleep(WARMER_REQUEST_DELAY)
+
+    return added
+
+
+async def run_anime_cache_warmer() -> None:
+    """
+    Фоновая задача прогрева аниме кэша: первый прогон через WARMER_START_DELAY после старта, далее раз в WARMER_INTERVAL.
+    """
+    if not WARMER_ENABLED:
+        logger.info("[CacheWarmer] - Прогрев кэша отключён в конфигурации")
+        return
+
+    await asyncio.sleep(WARMER_START_DELAY)
+
+    while True:
+        try:
+            logger.info("[CacheWarmer] - 🔁 Прогрев аниме кэша...")
+            added = await warm_anime_cache()
+            logger.info(f"[CacheWarmer] - ✅ Прогрев завершён, добавлено {added} аниме")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[CacheWarmer] - ❌ Ошибка прогрева аниме кэша: {e}")
+
+        await asyncio.sleep(WARMER_INTERVAL)
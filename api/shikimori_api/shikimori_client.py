@@ -0,0 +1,163 @@
+import asyncio
+import json
+import random
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+
+import aiohttp
+
+from _configs.config import get_config
+from _configs.log_config import logger
+from api.api_response import ApiResponse
+from tools.single_flight import SingleFlight
+from tools.token_bucket import TokenBucket
+
+
+cfg = get_config()
+
+HEADERS = cfg.shikimori_config.headers
+GQL_URL = cfg.shikimori_config.gql_url
+SHIKIMORI_REQUEST_TIMEOUT = cfg.shikimori_config.request_timeout
+SHIKIMORI_CONNECTIONS_LIMIT = cfg.shikimori_config.connections_limit
+SHIKIMORI_KEEPALIVE_TIMEOUT = cfg.shikimori_config.keepalive_timeout
+SHIKIMORI_RATE_LIMIT = cfg.shikimori_config.rate_limit_per_second
+SHIKIMORI_RATE_LIMIT_BURST = cfg.shikimori_config.rate_limit_burst
+SHIKIMORI_MAX_RETRIES = cfg.shikimori_config.max_retries_on_429
+SHIKIMORI_BACKOFF_BASE = cfg.shikimori_config.backoff_base
+SHIKIMORI_BACKOFF_MAX = cfg.shikimori_config.backoff_max
+
+RETRYABLE_STATUSES = (429, 503)
+
+
+class ShikimoriResponse(ApiResponse):
+    """
+    Ответ Shikimori GraphQL API, уже прочитанный из сокета (status_code, text, json()).
+    """
+
+
+def _retry_after(response: ShikimoriResponse) -> Optional[float]:
+    """Значение Retry-After в секундах (заголовок бывает числом или HTTP-датой)."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class ShikimoriClient:
+    _instance = None
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+        self._single_flight = SingleFlight()
+        self._bucket = TokenBucket(rate=SHIKIMORI_RATE_LIMIT, capacity=SHIKIMORI_RATE_LIMIT_BURST)
+
+    @classmethod
+    def get_instance(cls) -> "ShikimoriClient":
+        """
+        Singleton: одна сессия (и один пул keep-alive соединений к shikimori.one) на процесс.
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    async def start(self) -> None:
+        """
+        Открывает сессию заранее (вызывается в on_startup). Если не вызвать — сессия создастся при первом запросе.
+        """
+        await self._get_session()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            async with self._lock:
+                if self._session is None or self._session.closed:
+                    self._session = aiohttp.ClientSession(
+                        connector=aiohttp.TCPConnector(
+                            limit=SHIKIMORI_CONNECTIONS_LIMIT,
+                            keepalive_timeout=SHIKIMORI_KEEPALIVE_TIMEOUT,
+                            ttl_dns_cache=300
+                        ),
+                        timeout=aiohttp.ClientTimeout(total=SHIKIMORI_REQUEST_TIMEOUT),
+                        headers=HEADERS
+                    )
+                    logger.info("[ShikimoriClient] - ✅ Создана сессия Shikimori API")
+        return self._session
+
+    async def graphql(self, query: str, variables: Optional[dict] = None) -> ShikimoriResponse:
+        """
+        POST-запрос к GraphQL API Shikimori через общую сессию.
+        Одинаковые (query, variables) запросы, пришедшие одновременно, выполняются один раз.
+
+        :param query: текст GraphQL-запроса
+        :param variables: переменные запроса
+        :return: ShikimoriResponse объект
+        """
+        variables = variables or {}
+        key = (query, json.dumps(variables, sort_keys=True, ensure_ascii=False))
+        return await self._single_flight.do(key, lambda: self._post_graphql(query, variables))
+
+    async def _post_graphql(self, query: str, variables: dict) -> ShikimoriResponse:
+        return await self._request("POST", GQL_URL, json={"query": query, "variables": variables})
+
+    async def get(self, url: str, params: Optional[dict] = None) -> ShikimoriResponse:
+        """
+        GET-запрос к REST API Shikimori через общую сессию.
+
+        :param url: полный адрес ресурса
+        :param params: query-параметры
+        :return: ShikimoriResponse объект
+        """
+        return await self._request("GET", url, params=params)
+
+    async def _request(self, method: str, url: str, **kwargs) -> ShikimoriResponse:
+        """
+        Все запросы к Shikimori проходят через общий token bucket.
+        На 429/503 бакет ставится на паузу (Retry-After или экспоненциальная пауза с jitter) и запрос повторяется.
+        """
+        session = await self._get_session()
+
+        for attempt in range(SHIKIMORI_MAX_RETRIES + 1):
+            await self._bucket.acquire()
+            async with session.request(method, url, **kwargs) as response:
+                text = await response.text(encoding="utf-8")
+                shikimori_response = ShikimoriResponse(response.status, text, dict(response.headers))
+
+            if shikimori_response.status_code not in RETRYABLE_STATUSES or attempt == SHIKIMORI_MAX_RETRIES:
+                return shikimori_response
+
+            delay = _retry_after(shikimori_response)
+            if delay is None:
+                delay = random.uniform(0, min(SHIKIMORI_BACKOFF_MAX, SHIKIMORI_BACKOFF_BASE * 2 ** attempt))
+            self._bucket.pause(delay)
+
+            logger.warning(f"[ShikimoriClient] - {shikimori_response.status_code} от {url}, "
+                           f"повтор через {delay:.2f} с. (попытка {attempt + 1}). Очередь: {self._bucket.stats()}")
+
+        return shikimori_response
+
+    def rate_limit_stats(self) -> dict:
+        """
+        Метрики лимитера: глубина очереди (текущая и максимальная), выдано токенов, среднее ожидание, остаток паузы.
+        """
+        return self._bucket.stats()
+
+    async def close(self) -> None:
+        if self._session and not self._session.closed:
+            await self._session.close()
+            logger.info("[ShikimoriClient] - Сессия Shikimori API закрыта")
+
+
+def get_shikimori_client() -> ShikimoriClient:
+    """
+    Получение общего клиента Shikimori API
+    :return: объект ShikimoriClient
+    """
+    return ShikimoriClient.get_instance()
@@ -1,47 +1,61 @@
 # Стандартные библиотеки
 import asyncio
-import json
-import os
+import datetime
 import random
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from time import sleep
+import time
 
 import aiohttp
-import requests
 
 from _configs.config import get_config
 from _configs.log_config import logger
+from api.shikimori_api.anime_name_cache import anime_name_cache
+from api.shikimori_api.shikimori_client import get_shikimori_client
 from data.shikimori_genres_id_to_name import GENRES_ID_TO_NAME
+from database.local_anime_cache_store import get_local_anime_cache_store
 from database.repositories import get_anime_cache_repository
-from tools.cache_tools import cache_anime_list_in_background
+from tools.cache_tools import cache_anime_list_in_background, get_anime_genre_index
 from tools.common_utils import get_kodik_response
+from tools.single_flight import SingleFlight
 
 
 cfg = get_config()
 
-HEADERS = cfg.shikimori_config.headers
 REST_URL = cfg.shikimori_config.rest_url
-GQL_URL = cfg.shikimori_config.gql_url
 MAX_RETRIES_FOR_CHARACTERS = cfg.retry_logic_config.max_retries_for_characters
 RETRY_DELAY_FOR_CHARACTERS = cfg.retry_logic_config.retry_delay_for_characters
+ORIGIN_CONCURRENCY = cfg.shikimori_config.origin_concurrency
 
 SITE_URL = cfg.bot_config.site_url
+GENRE_LOCAL_MIN_POOL = cfg.cache_config.genre_local_min_pool
+TOP_BY_YEAR_SIZE = cfg.cache_config.top_by_year_size
+TOP_BY_YEAR_REFRESH_INTERVAL = cfg.cache_config.top_by_year_refresh_interval
+TOP_BY_YEAR_PAST_TTL = cfg.cache_config.top_by_year_past_ttl
+TOP_BY_YEAR_REQUESTED_TTL = cfg.cache_config.top_by_year_requested_ttl
+TOP_BY_YEAR_MIN_YEAR = 1917    # Самые ранние аниме в базе Shikimori
 
-ANIME_CACHE = cfg.cache_config.anime_cache_path
-ANIME_CACHE_BY_NAME = cfg.cache_config.anime_cache_by_name_path
+GENRE_PAGE_SIZE = 50    # Максимальный limit одной страницы animes в GraphQL Shikimori
+GENRE_PAGES_PER_WAVE = max(1, min(cfg.shikimori_config.genre_pages_per_wave, cfg.shikimori_config.rate_limit_burst))
+
+_by_name_single_flight = SingleFlight()
+_top_by_year_single_flight = SingleFlight()
+_top_by_year_requested: dict[int, float] = {}    # Год -> время последнего запроса топа (unix-секунды)
 
 
 # ====== Запрос по названию ======
 async def get_data_anime_by_name(title_name: str, limit: int = 10):
-    cached_by_name = load_cache(ANIME_CACHE_BY_NAME)
-    logger.violet(f"[get_data_anime_by_name] - json лог для {title_name} / {title_name.lower()}"
-                  f"\n{json.dumps(cached_by_name, indent=4, ensure_ascii=False)}")
+    # Одновременные поиски одного и того же названия делят один запрос и одну запись в кэш
+    return await _by_name_single_flight.do(
+        (title_name.lower(), limit),
+        lambda: _get_data_anime_by_name(title_name, limit)
+    )
+
+
+async def _get_data_anime_by_name(title_name: str, limit: int):
+    cached_by_name = anime_name_cache.get(title_name.lower())
 
-    if title_name.lower() in cached_by_name:
-        cached_list = transform_anime_data(cached_by_name[title_name.lower()])
+    if cached_by_name is not None:
+        cached_list = transform_anime_data(cached_by_name)
         logger.info(f"[get_data_anime_by_name] - Данные для '{title_name}' найдены в кэше по названию. Выдан кэш.")
-        logger.violet(f"[get_data_anime_by_name] - лог кэша по названию {title_name.lower()}"
-                      f"\n{json.dumps(cached_by_name[title_name.lower()], indent=4, ensure_ascii=False)}")
         return cached_list, True
 
     anime_cache_repository = await get_anime_cache_repository()
@@ -71,44 +85,38 @@ async def get_data_anime_by_name(title_name: str, limit: int = 10):
     }
     """
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            'https://shikimori.one/api/graphql',
-            json={'query': query, 'variables': variables},
-            headers=HEADERS
-        ) as response:
-            if response.status == 200:
-                cache_data = await response.json()
+    try:
+        response = await get_shikimori_client().graphql(query, variables)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"[get_data_anime_by_name] - Ошибка соединения с Shikimori API: {e}")
+        return {"error": f"Error: {e}"}, False
 
-                existing_cache = load_cache(ANIME_CACHE)
-                cached_by_name[title_name.lower()] = {}
+    if response.status_code == 200:
+        cache_data = response.json()
 
-                anime_entries = []
+        cached_by_name = {}
+        anime_entries = []
 
-                for anime in cache_data['data']['animes']:
-                    anime_id = anime['id']
-                    anime_entry = create_anime_cache_entry(anime)
+        animes = cache_data['data']['animes']
+        # Запросы к KodikAPI идут параллельно через общий пул соединений
+        built_entries = await asyncio.gather(*(create_anime_cache_entry(anime) for anime in animes))
 
-                    existing_cache[anime_id] = anime_entry
-                    cached_by_name[title_name.lower()][anime_id] = anime_entry
-                    anime_entries.append((anime_id, anime_entry))
+        for anime, anime_entry in zip(animes, built_entries):
+            anime_id = anime['id']
 
-                if anime_cache_repository:
-                    cache_anime_list_in_background(anime_entries, anime_cache_repository)
+            cached_by_name[anime_id] = anime_entry
+            anime_entries.append((anime_id, anime_entry))
 
-                try:
-                    save_cache(cached_by_name, ANIME_CACHE_BY_NAME)
-                except Exception as e:
-                    logger.warning(f"[get_data_anime_by_name] - Сохранение кэша для каруселей не прошло.\n{e}")
-                else:
-                    logger.info(f"[get_data_anime_by_name] - Кэш сохранён: {len(cached_by_name)} элементов")
+        if anime_cache_repository:
+            cache_anime_list_in_background(anime_entries, anime_cache_repository)
 
-                return cache_data, False
+        anime_name_cache.set(title_name.lower(), cached_by_name)
 
-            else:
-                text = await response.text(encoding='utf-8')
-                logger.error(f"[get_data_anime_by_name] - Ошибка API: {response.status}, \n\n{text}")
-                return {"error": f"Error: {response.status}"}, False
+        return cache_data, False
+
+    else:
+        logger.error(f"[get_data_anime_by_name] - Ошибка API: {response.status_code}, \n\n{response.text}")
+        return {"error": f"Error: {response.status_code}"}, False
 
 # ===================================
 
@@ -118,10 +126,14 @@ async def get_data_anime_by_genre(
         min_score: int = 7,
         limit: int = 10,
         max_page: int = 10,
-        tries: int = 2,
-        request_rate_limit: float = 0.2,
         max_requests: int = 10
 ):
+    """
+    Подборка аниме жанра genre_id с оценкой не ниже min_score.
+    Если в локальном кэше достаточно подходящих аниме — выборка делается из индекса по жанрам без запросов к Shikimori.
+
+    :return: (список аниме или None, is_cache) — is_cache=True, если записи в формате локального кэша
+    """
     query = """
     query GetAnime($genre: String, $score: Int, $limit: Int, $page: Int) {
       animes(genre: $genre, score: $score, limit: $limit, page: $page, kind: "!special,!ova,!ona,!music,!pv,!cm,!tv_special") {
@@ -149,72 +161,100 @@ async def get_data_anime_by_genre(
     }
     """
     genre_name = GENRES_ID_TO_NAME.get(genre_id, str(genre_id))
-    logger.info(f"[GetDataWithGenre] - Запрос жанра id={genre_id} ({genre_name}), оценка >= {min_score}, лимит={limit}, попыток={tries}")
+
+    genre_index = get_anime_genre_index()
+    local_pool = genre_index.pool_size(genre_id, min_score)
+    if local_pool >= max(limit, GENRE_LOCAL_MIN_POOL):
+        logger.info(f"[GetDataWithGenre] - Жанр id={genre_id} ({genre_name}), оценка >= {min_score}: "
+                    f"выборка из локального кэша ({local_pool} подходящих аниме)")
+        return genre_index.sample(genre_id, min_score, limit), True
+
+    logger.info(f"[GetDataWithGenre] - Запрос жанра id={genre_id} ({genre_name}), оценка >= {min_score}, лимит={limit}")
 
     collected = []
     seen_ids = set()
 
-    async with aiohttp.ClientSession() as session:
-        request_count = 0
+    client = get_shikimori_client()
 
-        while len(collected) < limit and request_count < max_requests:
+    async def fetch_page(page: int) -> list:
+        variables = {
+            "genre": str(genre_id),
+            "score": min_score,
+            "limit": GENRE_PAGE_SIZE,
+            "page": page
+        }
+        logger.debug(f"[GetDataWithGenre] - Запрос page={page} | variables={variables}")
 
-            if request_count == 1:
-                page = 1
-                logger.debug("[GetDataWithGenre] - После 1х попытки фолбэк на первую страницу")
-            else:
-                page = random.randint(1, max_page)
+        response = await client.graphql(query, variables)
+        if response.status_code != 200:
+            logger.error(f"[GetDataWithGenre] - Ошибка при запросе page={page}: {response.status_code}")
+            return []
 
-            variables = {
-                "genre": str(genre_id),
-                "score": min_score,
-                "limit": 50,
-                "page": page
-            }
+        json_data = response.json()
+        logger.debug(f"API Response: {json_data}")
+        return json_data.get("data", {}).get("animes", [])
 
-            logger.debug(f"[GetDataWithGenre] - Запрос #{request_count + 1} | page={page} | variables={variables}")
+    async def collect(pages: list[int]) -> int | None:
+        """
+        Параллельно запрашивает pages (темп задаёт общий лимитер клиента), останавливается, как только набрано limit.
+        :return: наименьший номер неполной страницы (страниц после неё нет) или None
+        """
+        short_page = None
+        tasks = {asyncio.create_task(fetch_page(page)): page for page in pages}
 
-            try:
-                async with session.post(
-                        "https://shikimori.one/api/graphql",
-                        json={"query": query, "variables": variables},
-                        headers=HEADERS
-                ) as response:
-                    if response.status != 200:
-                        logger.error(f"[GetDataWithGenre] - Ошибка при запросе: {response.status}")
-                        request_count += 1
-                        continue
+        async def fetch_with_page(task: asyncio.Task) -> tuple[int, list]:
+            return tasks[task], await task
+
+        try:
+            for done in asyncio.as_completed([fetch_with_page(task) for task in tasks]):
+                try:
+                    page, animes = await done
+                except Exception as e:
+                    logger.warning(f"[GetDataWithGenre] - Ошибка при запросе: {e}")
+                    continue
+
+                logger.debug(f"[GetDataWithGenre] - page={page}: получено аниме {len(animes)} шт.")
+                if len(animes) < GENRE_PAGE_SIZE:
+                    short_page = page if short_page is None else min(short_page, page)
 
-                    try:
-                        json_data = await response.json()
-                        logger.debug(f"API Response: {json_data}")
-                    except Exception as e:
-                        logger.error(f"[GetDataWithGenre] - Ошибка при парсинге JSON: {e}")
-                        request_count += 1
+                for anime in animes:
+                    anime_id = anime.get("id")
+                    if not anime_id or anime_id in seen_ids:
                         continue
 
-                    animes = json_data.get("data", {}).get("animes", [])
-                    logger.debug(f"[GetDataWithGenre] - Получено аниме: {len(animes)} шт. на странице {page}")
+                    seen_ids.add(anime_id)
+                    collected.append(anime)
+                    logger.debug(f"[GetDataWithGenre] - Добавлено: {anime.get('russian', anime.get('name'))} | score={anime.get('score')}")
+
+                if len(collected) >= limit:
+                    break
+        finally:
+            # Набрали нужное (или вызов отменён) — оставшиеся страницы больше не нужны
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-                    for anime in animes:
-                        anime_id = anime.get("id")
-                        if not anime_id or anime_id in seen_ids:
-                            continue
+        return short_page
 
-                        seen_ids.add(anime_id)
-                        collected.append(anime)
-                        logger.debug(f"[GetDataWithGenre] - Добавлено: {anime.get('russian', anime.get('name'))} | score={anime.get('score')}")
+    # Случайные страницы без повторов, волнами по GENRE_PAGES_PER_WAVE параллельных запросов (в пределах
+    # всплеска лимитера). Следующая волна — только если limit не набран; неполная страница отсекает страницы после неё.
+    pending_pages = random.sample(range(1, max_page + 1), k=min(max_requests, max_page))
+    last_page = max_page
 
-                    request_count += 1
-                    await asyncio.sleep(request_rate_limit)
+    while pending_pages and len(collected) < limit:
+        wave = [page for page in pending_pages if page <= last_page][:GENRE_PAGES_PER_WAVE]
+        if not wave:
+            break
 
-            except Exception as e:
-                logger.warning(f"[GetDataWithGenre] - Ошибка при запросе: {e}")
-                request_count += 1
-                continue
+        pending_pages = [page for page in pending_pages if page not in wave]
+        logger.debug(f"[GetDataWithGenre] - Набрано {len(collected)} из {limit}, запрос страниц {wave}")
 
-        if len(collected) < limit:
-            logger.warning(f"[GetDataWithGenre] - Не удалось набрать {limit} аниме, возвращаем {len(collected)} шт.")
+        short_page = await collect(wave)
+        if short_page is not None:
+            last_page = min(last_page, short_page)
+
+    if len(collected) < limit:
+        logger.warning(f"[GetDataWithGenre] - Не удалось набрать {limit} аниме, возвращаем {len(collected)} шт.")
 
     if collected:
         if len(collected) > limit:
@@ -222,18 +262,20 @@ async def get_data_anime_by_genre(
         else:
             collected = sorted(collected, key=lambda x: float(x.get("score", 0)), reverse=True)
 
-    return collected[:limit] if collected else None
+    return (collected[:limit] if collected else None), False
 
 # ===================================
 
 # ====== Работа с персонажами ======
-def get_top_anime_by_year_and_rating(year=2024, min_score=7, attempts=3):
-    page_ranges = [10, 5]
-    limit = 10
+async def fetch_top_anime_by_year(year: int, size: int = TOP_BY_YEAR_SIZE) -> list[dict] | None:
+    """
+    Запрашивает у Shikimori лучшие аниме года (order: ranked) и возвращает их по убыванию оценки.
 
+    :return: список аниме или None, если запрос не удался
+    """
     query = """
-    query GetAnime($year: Int, $limit: Int, $page: Int) {
-        animes(year: $year, limit: $limit, page: $page) {
+    query GetTopAnime($season: SeasonString, $limit: Int) {
+        animes(season: $season, order: ranked, limit: $limit, kind: "!special,!ova,!ona,!music,!pv,!cm,!tv_special") {
             id
             name
             russian
@@ -246,69 +288,118 @@ def get_top_anime_by_year_and_rating(year=2024, min_score=7, attempts=3):
             season
             airedOn {
                 year
-                    }
+            }
             poster {
                 originalUrl
                 mainUrl
             }
-            genres { 
-                russian  
+            genres {
+                russian
             }
-            studios { 
-                name 
+            studios {
+                name
             }
             description
         }
     }
     """
+    variables = {'season': str(year), 'limit': size}
 
-    for range_limit in page_ranges:
-        page = random.randint(1, range_limit)
+    try:
+        response = await get_shikimori_client().graphql(query, variables)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning(f"[GetTopAnime] Ошибка соединения (year={year}): {e}")
+        return None
 
-        variables = {
-            'year': year,
-            'limit': limit,
-            'page': page
-        }
+    if response.status_code != 200:
+        logger.warning(f"[GetTopAnime] Ошибка запроса (year={year}): {response.status_code}")
+        return None
 
-        response = requests.post(
-            'https://shikimori.one/api/graphql',
-            json={
-                'query': query,
-                'variables': variables
-            },
-            headers=HEADERS
-        )
+    animes = response.json().get("data", {}).get("animes") or []
+    logger.debug(f"[GetTopAnime] Получено {len(animes)} аниме за {year} год")
 
-        if response.status_code == 200:
-            data = response.json().get("data", {}).get("animes", [])
-            logger.debug(f"[GetTopAnime] Успешный запрос (page={page}) с параметрами {json.dumps(variables, ensure_ascii=False)}")
+    return sorted(animes, key=lambda x: float(x.get("score") or 0), reverse=True)
 
-            if not data:
-                logger.warning(f"[GetTopAnime] Нет аниме на странице {page}")
-                continue
 
-            filtered = [anime for anime in data if anime.get("score", 0) >= min_score]
-            logger.debug(f"[GetTopAnime] После фильтрации: {len(filtered)} аниме")
+async def refresh_top_by_year(year: int) -> bool:
+    """Перезапрашивает топ года и сохраняет его в локальное хранилище."""
+    animes = await _top_by_year_single_flight.do(year, lambda: fetch_top_anime_by_year(year))
+    if animes is None:
+        return False
 
-            if not filtered:
-                logger.warning(f"[GetTopAnime] На странице {page} нет аниме с рейтингом >= {min_score}")
-                continue
+    await asyncio.to_thread(get_local_anime_cache_store().set_top_by_year, year, animes)
+    logger.info(f"[GetTopAnime] ✅ Топ за {year} год обновлён ({len(animes)} аниме)")
+    return True
 
-            sorted_anime = sorted(filtered, key=lambda x: float(x.get("rating", 0)), reverse=True)
-            logger.debug(f"[GetTopAnime] После сортировки: {len(sorted_anime)} аниме")
 
-            return sorted_anime[:limit]
+async def get_top_anime_by_year_and_rating(year=2024, min_score=7, limit=10):
+    """
+    Топ аниме года с оценкой не ниже min_score из материализованной таблицы top_by_year.
+    В Shikimori запрос уходит, только если этого года ещё нет в хранилище — дальше его обновляет фоновая задача.
+    """
+    max_year = datetime.date.today().year + 1
+    if not TOP_BY_YEAR_MIN_YEAR <= year <= max_year:
+        logger.debug(f"[GetTopAnime] Год {year} вне диапазона {TOP_BY_YEAR_MIN_YEAR}-{max_year}")
+        return {"error": f"Год должен быть от {TOP_BY_YEAR_MIN_YEAR} до {max_year}"}
 
-        else:
-            logger.warning(f"[GetTopAnime] Ошибка запроса (page={page}): {response.status_code}")
+    _top_by_year_requested[year] = time.time()
+    materialized = await asyncio.to_thread(get_local_anime_cache_store().get_top_by_year, year)
+
+    if materialized is None:
+        logger.info(f"[GetTopAnime] Топа за {year} год нет в хранилище, запрашиваю Shikimori")
+        if not await refresh_top_by_year(year):
+            return {"error": f"Не удалось получить топ за {year} год"}
+        materialized = await asyncio.to_thread(get_local_anime_cache_store().get_top_by_year, year)
+
+    animes, _ = materialized
+    filtered = [anime for anime in animes if float(anime.get("score") or 0) >= min_score]
+    logger.debug(f"[GetTopAnime] {year} год: {len(filtered)} из {len(animes)} аниме с оценкой >= {min_score}")
 
-    return {"error": "Не удалось получить данные после 3 попыток"}
+    return filtered[:limit]
+
+
+async def run_top_by_year_refresher() -> None:
+    """
+    Фоновая задача: держит top_by_year свежим.
+    Текущий и прошлый год обновляются раз в TOP_BY_YEAR_REFRESH_INTERVAL, более старые — раз в TOP_BY_YEAR_PAST_TTL
+    и только если их запрашивали за последние TOP_BY_YEAR_REQUESTED_TTL секунд.
+    """
+    store = get_local_anime_cache_store()
+
+    while True:
+        try:
+            current_year = datetime.date.today().year
+            refreshed = await asyncio.to_thread(store.get_top_by_year_refreshed)
+            refreshed.setdefault(current_year, 0.0)
+            refreshed.setdefault(current_year - 1, 0.0)
+
+            now = time.time()
+            for year, requested_at in list(_top_by_year_requested.items()):
+                if now - requested_at >= TOP_BY_YEAR_REQUESTED_TTL:
+                    del _top_by_year_requested[year]
+
+            for year, refreshed_at in sorted(refreshed.items(), reverse=True):
+                if year >= current_year - 1:
+                    ttl = TOP_BY_YEAR_REFRESH_INTERVAL
+                elif year in _top_by_year_requested:
+                    ttl = TOP_BY_YEAR_PAST_TTL
+                else:
+                    continue
+
+                if now - refreshed_at >= ttl:
+                    await refresh_top_by_year(year)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[GetTopAnime] ❌ Ошибка фонового обновления топа по годам: {e}")
+
+        await asyncio.sleep(TOP_BY_YEAR_REFRESH_INTERVAL)
 
 # ===================================
 
 # ====== Работа с персонажами ======
-def send_data_random_person(max_attempts=5):
+async def send_data_random_person(max_attempts=5):
     for attempt in range(max_attempts):
         character_id = random.randint(1, 99999)
 
@@ -340,12 +431,7 @@ def send_data_random_person(max_attempts=5):
         }""" % character_id
 
         try:
-            response = requests.post(
-                'https://shikimori.one/api/graphql',
-                json={'query': query},
-                headers=HEADERS,
-                timeout=10
-            )
+            response = await get_shikimori_client().graphql(query)
 
             if response.status_code == 200:
                 data = response.json()
@@ -353,22 +439,33 @@ def send_data_random_person(max_attempts=5):
                 if characters and characters[0].get('id'):
                     return characters[0]
 
-            sleep(1)
-
         except Exception as e:
             logger.warning(f"[RandomPerson] - Попытка {attempt + 1} Провалы: {str(e)}")
-            sleep(2)
 
     return None
 
 
-def fetch_origin(char_id):
+async def fetch_origin(char_id):
     """
     Запрашивает полную инфу по персонажу через REST и возвращает его источник: anime → manga → ranobe.
+    Сетевые ошибки и 5xx повторяются до MAX_RETRIES_FOR_CHARACTERS раз с растущей паузой (429 обрабатывает клиент).
     """
     try:
-        r = requests.get(REST_URL.format(id=char_id), headers=HEADERS)
-        logger.debug(f"[fetch_origin] – GET /characters/{char_id} → код {r.status_code}")
+        for attempt in range(MAX_RETRIES_FOR_CHARACTERS):
+            try:
+                r = await get_shikimori_client().get(REST_URL.format(id=char_id))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"[fetch_origin] – Персонаж {char_id}: ошибка соединения ({e}), попытка {attempt + 1}")
+            else:
+                logger.debug(f"[fetch_origin] – GET /characters/{char_id} → код {r.status_code}")
+                if r.status_code < 500:
+                    break
+
+            if attempt + 1 < MAX_RETRIES_FOR_CHARACTERS:
+                await asyncio.sleep(random.uniform(0, RETRY_DELAY_FOR_CHARACTERS * 2 ** attempt))
+        else:
+            logger.warning(f"[fetch_origin] – Персонаж {char_id}: попытки исчерпаны, возвращаю None")
+            return None
 
         if r.status_code != 200:
             logger.warning(f"[fetch_origin] – Персонаж {char_id}: статус {r.status_code}, возвращаю None")
@@ -407,10 +504,11 @@ def fetch_origin(char_id):
         return None
 
 
-def send_data_character(character_name, limit=10):
+async def send_data_character(character_name, limit=10):
     """
     Делает один GQL-запрос по имени персонажа и добавляет источник (origin) через REST-запрос.
-    Обрабатывает всех персонажей без фильтрации, origin подгружается параллельно.
+    Обрабатывает всех персонажей без фильтрации, origin подгружается параллельно
+    (не более ORIGIN_CONCURRENCY запросов одновременно).
     """
     query = """
     query ($search: String, $limit: Int) {
@@ -437,7 +535,7 @@ def send_data_character(character_name, limit=10):
     variables = {'search': character_name, 'limit': limit}
 
     try:
-        resp = requests.post(GQL_URL, json={'query': query, 'variables': variables}, headers=HEADERS)
+        resp = await get_shikimori_client().graphql(query, variables)
         logger.debug(f"[send_data_character] - Статус ответа GQL: {resp.status_code}")
 
         if resp.status_code != 200:
@@ -451,29 +549,32 @@ def send_data_character(character_name, limit=10):
         logger.exception(f"[send_data_character] - Ошибка при запросе персонажей: {e}")
         return {'data': {'characters': []}}
 
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_char = {executor.submit(fetch_origin, ch['id']): ch for ch in characters}
-        for future in as_completed(future_to_char):
-            ch = future_to_char[future]
-            try:
-                origin = future.result()
-            except Exception as e:
-                logger.error(f"[send_data_character] - Ошибка при получении origin: {e}. ch={ch!r}")
-                origin = None
-            ch['origin'] = origin
+    semaphore = asyncio.Semaphore(ORIGIN_CONCURRENCY)
 
-            try:
-                name = ch.get('name', '???')
-                char_id = ch.get('id', '???')
-                if origin:
-                    logger.debug(
-                        f"[send_data_character] - {name} (id={char_id}) → {origin['type']} "
-                        f"«{origin['name']}» ({origin['url']})"
-                    )
-                else:
-                    logger.debug(f"[send_data_character] - {name} (id={char_id}) → origin = None")
-            except Exception as e:
-                logger.error(f"[send_data_character] - Ошибка при логировании origin: {e}. ch={ch!r}")
+    async def fetch_origin_limited(char_id):
+        async with semaphore:
+            return await fetch_origin(char_id)
+
+    origins = await asyncio.gather(*(fetch_origin_limited(ch['id']) for ch in characters), return_exceptions=True)
+
+    for ch, origin in zip(characters, origins):
+        if isinstance(origin, Exception):
+            logger.error(f"[send_data_character] - Ошибка при получении origin: {origin}. ch={ch!r}")
+            origin = None
+        ch['origin'] = origin
+
+        try:
+            name = ch.get('name', '???')
+            char_id = ch.get('id', '???')
+            if origin:
+                logger.debug(
+                    f"[send_data_character] - {name} (id={char_id}) → {origin['type']} "
+                    f"«{origin['name']}» ({origin['url']})"
+                )
+            else:
+                logger.debug(f"[send_data_character] - {name} (id={char_id}) → origin = None")
+        except Exception as e:
+            logger.error(f"[send_data_character] - Ошибка при логировании origin: {e}. ch={ch!r}")
 
     return {'data': {'characters': characters}}
 
@@ -481,27 +582,7 @@ def send_data_character(character_name, limit=10):
 
 
 # ====== Дополнительно ======
-def load_cache(file_path: str) -> dict:
-    """Загружает кэш из указанного файла, если он существует и содержит корректный JSON, или создаёт новый файл."""
-    if os.path.exists(file_path):
-        with open(file_path, 'r', encoding='utf-8') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                logger.error(f"[load_cache] Невалидный JSON в файле {file_path}, создаётся новый кэш.")
-                return {}
-    else:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump({}, f, indent=4, ensure_ascii=False)
-        logger.info(f"[load_cache] Файл {file_path} не существует, создаётся новый кэш.")
-        return {}
-
-def save_cache(cache_data: dict, cache_file_path: str) -> None:
-    """Сохраняет кэш в файл."""
-    with open(cache_file_path, 'w', encoding='utf-8') as f:
-        json.dump(cache_data, f, indent=4, ensure_ascii=False)
-
-def create_anime_cache_entry(anime: dict) -> dict:
+async def create_anime_cache_entry(anime: dict) -> dict:
     """Создает массив-словарь для кэша на основе данных об аниме.
     {
         \n'id': anime['id'],
@@ -543,7 +624,7 @@ def create_anime_cache_entry(anime: dict) -> dict:
 
     anime_id = capture.get('id')
     try:
-        kodik_iframe = get_kodik_response(anime_id).json()['results'][0].get('link')
+        kodik_iframe = (await get_kodik_response(anime_id)).json()['results'][0].get('link')
 
         if kodik_iframe:
             capture['kodik_iframe'] = kodik_iframe
@@ -1,13 +1,14 @@
 import asyncio
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 
 import asyncpg
-import json
-from pathlib import Path
 
 
 from _configs.config import get_config
 from _configs.log_config import logger
+from database.cache_invalidation import get_cache_invalidation_bus
+from database.local_anime_cache_store import dump_anime_data, get_local_anime_cache_store
 
 
 cfg = get_config()
@@ -18,7 +19,11 @@ CACHE_DB_HOST = cfg.database_config.cache_db_host
 CACHE_DB_PORT = cfg.database_config.cache_db_port
 CACHE_DB_NAME = cfg.database_config.cache_db_name
 
-CACHE_JSON_PATH = Path(cfg.cache_config.anime_cache_path)
+EXPORT_CHUNK_SIZE = cfg.cache_config.anime_cache_export_chunk_size
+SYNC_INTERVAL = cfg.cache_config.anime_cache_sync_interval
+SYNC_OVERLAP = timedelta(seconds=cfg.cache_config.anime_cache_sync_overlap)
+
+SYNC_WATERMARK_KEY = "anime_cache_synced_until"
 
 
 class AnimeCacheRepository:
@@ -64,12 +69,38 @@ class AnimeCacheRepository:
                         logger.error(f"[[AnimeCacheRepository].create] - ❌ Ошибка при создании пула подключения: {err}")
                         return None
 
-                    cls._instance = cls(pool)
+                    instance = cls(pool)
+                    if not await instance.ensure_schema():
+                        # Без updated_at не работают ни upsert'ы, ни дельта-синхронизация — локальный кэш перестал бы наполняться
+                        await pool.close()
+                        return None
+
+                    cls._instance = instance
                     logger.info("[[AnimeCacheRepository].create] - ✅ AnimeCacheRepository: пул подключений успешно создан")
 
         return cls._instance
 
 
+    async def ensure_schema(self) -> bool:
+        """
+        Колонка updated_at (и индекс по ней) нужна для дельта-синхронизации; на существующих таблицах добавляется один раз.
+        :return: True, если схема готова
+        """
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    ALTER TABLE anime_cache ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+                    CREATE INDEX IF NOT EXISTS anime_cache_updated_at_idx ON anime_cache (updated_at);
+                    """
+                )
+        except Exception as err:
+            logger.critical(f"[AnimeCacheRepository][ensure_schema] ❌ Не удалось добавить updated_at: {err}")
+            return False
+
+        return True
+
+
     # ====== Геттер для anime_data ======
     async def get_anime_data(self, anime_id: int) -> Optional[dict]:
         try:
@@ -90,94 +121,135 @@ class AnimeCacheRepository:
                     INSERT INTO anime_cache (anime_id, data)
                     VALUES ($1, $2)
                     ON CONFLICT (anime_id)
-                    DO UPDATE SET data = EXCLUDED.data
+                    DO UPDATE SET data = EXCLUDED.data, updated_at = now()
                     """,
-                    anime_id, json.dumps(data)
+                    anime_id, dump_anime_data(data)
                 )
             logger.violet(f"[AnimeCacheRepository][set_data] ✅ Данные обновлены для anime_id={anime_id}")
+            await get_cache_invalidation_bus().publish("anime", anime_id, local=False)
             return True
         except Exception as err:
             logger.error(f"[AnimeCacheRepository][set_data] ❌ Ошибка при обновлении data: {err}")
             return False
 
 
-    # # ====== Загрузка всего кэша из БД и сохранение в файл ======
-    # async def export_cache_to_file(self) -> None:
-    #     try:
-    #         async with self.pool.acquire() as conn:
-    #             records = await conn.fetch("SELECT anime_id, data FROM anime_cache")
-    #
-    #         cache_dict = {record["anime_id"]: record["data"] for record in records}
-    #         CACHE_JSON_PATH.parent.mkdir(parents=True, exist_ok=True)
-    #
-    #         with CACHE_JSON_PATH.open("w", encoding="utf-8") as f:
-    #             json.dump(cache_dict, f, ensure_ascii=False, indent=2)
-    #
-    #         logger.info(
-    #             f"[AnimeCacheRepository][export_cache_to_file] ✅ Экспортировано {len(records)} записей в JSON файл."
-    #         )
-    #     except Exception as e:
-    #         logger.error(f"[AnimeCacheRepository][export_cache_to_file] ❌ Ошибка при экспорте кэша в файл: {e}")
-
-    # ====== Загрузка всего кэша из БД и сохранение в файл ======
-    async def export_cache_to_file(self) -> None:
-        try:
-            async with self.pool.acquire() as conn:
-                records = await conn.fetch("SELECT anime_id, data FROM anime_cache")
-
-            # Используем comprehension dictionary с применением json.loads
-            cache_dict = {}
-            for record in records:
-                try:
-                    cache_dict[record["anime_id"]] = json.loads(record["data"])
-                except json.JSONDecodeError as e:
-                    logger.error(
-                        f"[AnimeCacheRepository][export_cache_to_file] ❌ Ошибка при декодировании JSON для anime_id {record['anime_id']}: {e}"
+    # ====== Синхронизация БД -> локальное хранилище ======
+    async def _stream_to_local(self, since: Optional[datetime]) -> Tuple[int, int, Optional[datetime]]:
+        """
+        Читает anime_cache курсором пачками по EXPORT_CHUNK_SIZE строк (все строки или изменённые после since)
+        и пишет их в локальное хранилище (оно приводит JSON к каноничному виду и пропускает неизменённые записи).
+
+        :return: (прочитано строк, изменилось локально, максимальный updated_at среди прочитанных)
+        """
+        store = get_local_anime_cache_store()
+        exported = 0
+        changed = 0
+        max_updated_at = None
+
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                if since is None:
+                    cursor = await conn.cursor("SELECT anime_id, data, updated_at FROM anime_cache")
+                else:
+                    cursor = await conn.cursor(
+                        "SELECT anime_id, data, updated_at FROM anime_cache WHERE updated_at > $1 ORDER BY updated_at",
+                        since
+                    )
+
+                while rows := await cursor.fetch(EXPORT_CHUNK_SIZE):
+                    changed += await asyncio.to_thread(
+                        store.set_many, [(row["anime_id"], row["data"]) for row in rows]
                     )
-                    continue  # Пропустить проблемную запись
+                    exported += len(rows)
+                    chunk_max = max(row["updated_at"] for row in rows)
+                    max_updated_at = chunk_max if max_updated_at is None else max(max_updated_at, chunk_max)
+
+        return exported, changed, max_updated_at
+
+    async def sync_cache_to_local(self) -> None:
+        """
+        Дельта-синхронизация: забирает только строки, изменённые с прошлой синхронизации (отметка хранится
+        в локальном хранилище). Без отметки выполняется полная выгрузка.
+
+        Окно берётся с перекрытием SYNC_OVERLAP: updated_at — время начала транзакции, и строка из долгой транзакции
+        может стать видна позже строк с бо́льшим updated_at. Повторно прочитанные строки хранилище не перезаписывает.
+        """
+        store = get_local_anime_cache_store()
 
-            CACHE_JSON_PATH.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            watermark_raw = await asyncio.to_thread(store.get_meta, SYNC_WATERMARK_KEY)
+            watermark = datetime.fromisoformat(watermark_raw) if watermark_raw else None
 
-            with CACHE_JSON_PATH.open("w", encoding="utf-8") as f:
-                json.dump(cache_dict, f, ensure_ascii=False, indent=2)
+            exported, changed, max_updated_at = await self._stream_to_local(
+                watermark - SYNC_OVERLAP if watermark else None
+            )
 
-            logger.info(
-                f"[AnimeCacheRepository][export_cache_to_file] ✅ Экспортировано {len(records)} записей (после обработки ошибок) в JSON файл."
+            if max_updated_at is not None and (watermark is None or max_updated_at > watermark):
+                await asyncio.to_thread(store.set_meta, SYNC_WATERMARK_KEY, max_updated_at.isoformat())
+
+            log = logger.info if watermark is None or changed else logger.debug
+            log(
+                f"[AnimeCacheRepository][sync_cache_to_local] ✅ {'Полная выгрузка' if watermark is None else 'Дельта'}: "
+                f"прочитано {exported}, изменилось {changed} записей."
             )
         except Exception as e:
-            logger.error(f"[AnimeCacheRepository][export_cache_to_file] ❌ Ошибка при экспорте кэша в файл: {e}")
-
+            logger.error(f"[AnimeCacheRepository][sync_cache_to_local] ❌ Ошибка синхронизации кэша: {e}")
 
 
-    # ====== Добавление в БД и в файл ======
+    # ====== Добавление в БД и в локальное хранилище ======
     async def add_anime_cache(self, anime_id: int, data: dict) -> bool:
         """
-        Добавляет запись в БД и обновляет локальный JSON-файл кэша
+        Добавляет запись в БД и в локальное хранилище кэша (одна строка SQLite, без перезаписи всего кэша)
         """
         success = await self.set_data(int(anime_id), data)
-        logger.info(f"[AnimeCacheRepository][add_anime_cache] ✅ Попытка обновления кэша для ->"
-                    f"\nanime_id: {anime_id}({type(anime_id)})"
-                    f"\ndata: {data}"
-                    f"\nsuccess: {success}")
+        logger.debug(f"[AnimeCacheRepository][add_anime_cache] ✅ Попытка обновления кэша для ->"
+                     f"\nanime_id: {anime_id}({type(anime_id)})"
+                     f"\nsuccess: {success}")
         if success:
             try:
-                CACHE_JSON_PATH.parent.mkdir(parents=True, exist_ok=True)
+                await asyncio.to_thread(get_local_anime_cache_store().set, anime_id, data)
+                logger.info(f"[AnimeCacheRepository][add_anime_cache] ✅ Кэш обновлён для anime_id={anime_id}")
+            except Exception as e:
+                logger.error(f"[AnimeCacheRepository][add_anime_cache] ❌ Ошибка при обновлении локального кэша: {e}")
 
-                json_data = {}
-                if CACHE_JSON_PATH.exists():
-                    with CACHE_JSON_PATH.open("r", encoding="utf-8") as f:
-                        json_data = json.load(f)
+        return success
 
-                json_data[anime_id] = data
 
-                with CACHE_JSON_PATH.open("w", encoding="utf-8") as f:
-                    json.dump(json_data, f, ensure_ascii=False, indent=2)
+    # ====== Пакетное добавление в БД и в локальное хранилище ======
+    async def add_anime_cache_many(self, entries: List[Tuple[int, dict]]) -> bool:
+        """
+        Пакетный upsert: вся выдача поиска пишется в БД одним executemany (один round-trip),
+        затем одной транзакцией в локальное хранилище.
 
-                logger.info(f"[AnimeCacheRepository][add_anime_cache] ✅ Кэш обновлён для anime_id={anime_id}")
-            except Exception as e:
-                logger.error(f"[AnimeCacheRepository][add_anime_cache] ❌ Ошибка при обновлении кэша в JSON: {e}")
+        :param entries: Список кортежей (anime_id, data)
+        """
+        if not entries:
+            return True
 
-        return success
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.executemany(
+                    """
+                    INSERT INTO anime_cache (anime_id, data)
+                    VALUES ($1, $2)
+                    ON CONFLICT (anime_id)
+                    DO UPDATE SET data = EXCLUDED.data, updated_at = now()
+                    """,
+                    [(int(anime_id), dump_anime_data(data)) for anime_id, data in entries]
+                )
+        except Exception as err:
+            logger.error(f"[AnimeCacheRepository][add_anime_cache_many] ❌ Ошибка пакетного обновления data: {err}")
+            return False
+
+        logger.info(f"[AnimeCacheRepository][add_anime_cache_many] ✅ В БД записано {len(entries)} записей")
+        await get_cache_invalidation_bus().publish("anime", local=False)
+
+        try:
+            await asyncio.to_thread(get_local_anime_cache_store().set_many, entries)
+        except Exception as e:
+            logger.error(f"[AnimeCacheRepository][add_anime_cache_many] ❌ Ошибка при обновлении локального кэша: {e}")
+
+        return True
 
 
 async def init_anime_cache_repository():
@@ -192,3 +264,45 @@ async def init_anime_cache_repository():
 
     logger.info("✅ Инициализация AnimeCacheRepository успешна")
     return anime_cache_instance_repository
+
+
+# ====== Инвалидация из других процессов ======
+_sync_lock = asyncio.Lock()
+_sync_queued = False
+
+
+async def _on_anime_cache_changed(_anime_id: Optional[str]) -> None:
+    """
+    Другой процесс записал anime_cache — подтягиваем дельту, не дожидаясь периодической синхронизации.
+    Пачка уведомлений схлопывается: пока синхронизация идёт, в очереди ждёт не больше одной следующей.
+    """
+    global _sync_queued
+
+    repository = AnimeCacheRepository._instance
+    if repository is None or _sync_queued:
+        return
+
+    _sync_queued = True
+    try:
+        await _sync_lock.acquire()
+    finally:
+        _sync_queued = False
+
+    try:
+        await repository.sync_cache_to_local()
+    finally:
+        _sync_lock.release()
+
+
+get_cache_invalidation_bus().subscribe("anime", _on_anime_cache_changed)
+
+
+async def run_anime_cache_sync(repository: AnimeCacheRepository) -> None:
+    """
+    Фоновая задача: раз в SYNC_INTERVAL подтягивает в локальное хранилище изменения anime_cache,
+    сделанные другими процессами (бот, веб-воркеры).
+    """
+    while True:
+        await asyncio.sleep(SYNC_INTERVAL)
+        async with _sync_lock:
+            await repository.sync_cache_to_local()
@@ -0,0 +1,145 @@
+import asyncio
+import inspect
+import json
+import os
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+import asyncpg
+
+from _configs.config import get_config
+from _configs.log_config import logger
+
+
+cfg = get_config()
+
+INVALIDATION_CHANNEL = cfg.database_config.cache_invalidation_channel
+RECONNECT_DELAY = cfg.database_config.cache_invalidation_reconnect_delay
+
+# Идентификатор процесса: свои же уведомления не применяются повторно
+PROCESS_ID = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+InvalidationHandler = Callable[[Optional[str]], Awaitable[Any] | Any]
+
+
+class CacheInvalidationBus:
+    """
+    Межпроцессная инвалидация кэшей через Postgres LISTEN/NOTIFY.
+
+    Каждый процесс держит одно соединение из пула с LISTEN на INVALIDATION_CHANNEL.
+    publish(scope, key) сразу сбрасывает кэш в своём процессе и шлёт NOTIFY остальным.
+    Обработчик получает key, либо None — "сбросить всё" (после переподключения уведомления могли потеряться).
+    """
+    _instance = None
+
+    def __init__(self):
+        self._pool: Optional[asyncpg.Pool] = None
+        self._handlers: dict[str, list[InvalidationHandler]] = {}
+        self._listen_task: Optional[asyncio.Task] = None
+        self._tasks: set[asyncio.Task] = set()    # Ссылки на задачи обработки уведомлений, чтобы их не собрал GC
+
+    @classmethod
+    def get_instance(cls) -> "CacheInvalidationBus":
+        """
+        Singleton: одна подписка на канал на процесс.
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def subscribe(self, scope: str, handler: InvalidationHandler) -> None:
+        self._handlers.setdefault(scope, []).append(handler)
+
+    async def start(self, pool: asyncpg.Pool) -> None:
+        if self._listen_task is not None:
+            return
+        self._pool = pool
+        self._listen_task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self) -> None:
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            await asyncio.gather(self._listen_task, return_exceptions=True)
+            self._listen_task = None
+
+    # ====== Публикация ======
+    async def publish(self, scope: str, key: Any = None, local: bool = True) -> None:
+        """
+        Сбрасывает кэш scope/key в текущем процессе (если local) и оповещает остальные процессы.
+        """
+        key = None if key is None else str(key)
+        if local:
+            await self._dispatch(scope, key)
+
+        if self._pool is None:
+            return
+
+        payload = json.dumps({"scope": scope, "key": key, "origin": PROCESS_ID})
+        try:
+            async with self._pool.acquire() as conn:
+                await conn.execute("SELECT pg_notify($1, $2)", INVALIDATION_CHANNEL, payload)
+        except Exception as e:
+            logger.error(f"[CacheInvalidationBus] - ❌ Не удалось отправить инвалидацию {scope}:{key}: {e}")
+
+    # ====== Подписка ======
+    async def _dispatch(self, scope: str, key: Optional[str]) -> None:
+        for handler in self._handlers.get(scope, []):
+            try:
+                result = handler(key)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"[CacheInvalidationBus] - ❌ Ошибка обработчика {scope}:{key}: {e}")
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except json.JSONDecodeError:
+            logger.warning(f"[CacheInvalidationBus] - Некорректное уведомление: {payload}")
+            return
+
+        if message.get("origin") == PROCESS_ID:
+            return
+
+        logger.debug(f"[CacheInvalidationBus] - Инвалидация {message.get('scope')}:{message.get('key')}")
+        task = asyncio.create_task(self._dispatch(message.get("scope"), message.get("key")))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _listen_forever(self) -> None:
+        reconnected = False
+
+        while True:
+            try:
+                async with self._pool.acquire() as conn:
+                    closed = asyncio.Event()
+                    conn.add_termination_listener(lambda _: closed.set())
+                    await conn.add_listener(INVALIDATION_CHANNEL, self._on_notification)
+                    logger.info(f"[CacheInvalidationBus] - ✅ Подписка на канал {INVALIDATION_CHANNEL}")
+
+                    if reconnected:
+                        # Пока подписки не было, уведомления могли потеряться — сбрасываем всё
+                        for scope in self._handlers:
+                            await self._dispatch(scope, None)
+
+                    try:
+                        await closed.wait()
+                    finally:
+                        if not conn.is_closed():
+                            await conn.remove_listener(INVALIDATION_CHANNEL, self._on_notification)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[CacheInvalidationBus] - ❌ Потеряно соединение подписки: {e}")
+
+            reconnected = True
+            await asyncio.sleep(RECONNECT_DELAY)
+
+
+def get_cache_invalidation_bus() -> CacheInvalidationBus:
+    """
+    Получение шины межпроцессной инвалидации кэшей
+    :return: объект CacheInvalidationBus
+    """
+    return CacheInvalidationBus.get_instance()
@@ -0,0 +1,219 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from _configs.config import get_config
+from _configs.log_config import logger
+
+
+cfg = get_config()
+
+CACHE_DB_PATH = Path(cfg.cache_config.anime_cache_db_path)
+LEGACY_CACHE_JSON_PATH = Path(cfg.cache_config.anime_cache_path)
+
+
+def dump_anime_data(data: dict | str) -> str:
+    """
+    Каноничная JSON-строка записи аниме: одинаковая для Postgres и локального хранилища,
+    независимо от того, пришли данные словарём или текстом json/jsonb из БД.
+    По ней set_many отличает изменённые записи от неизменённых.
+    """
+    if isinstance(data, str):
+        data = json.loads(data)
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+class LocalAnimeCacheStore:
+    """
+    Локальное хранилище аниме кэша на SQLite.
+
+    Каждая запись пишется отдельной строкой за O(1) — без перечитывания и перезаписи всего файла.
+    Колонка seq монотонно растёт при каждой записи, поэтому читатели могут подтягивать
+    только изменения с последнего чтения (см. load_since).
+
+    Там же хранится материализованный "топ по году" (таблица top_by_year), который обновляется в фоне,
+    и служебные значения (таблица meta) — например, отметка последней синхронизации с БД.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS anime_cache (
+                anime_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                seq INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS anime_cache_seq_idx ON anime_cache (seq)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS top_by_year (
+                year INTEGER PRIMARY KEY,
+                data TEXT NOT NULL,
+                refreshed_at REAL NOT NULL
+            )
+            """
+        )
+
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+        self._seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM anime_cache").fetchone()[0]
+
+        if self._seq == 0:
+            self._import_legacy_json()
+
+    @classmethod
+    def get_instance(cls) -> "LocalAnimeCacheStore":
+        """
+
+        Singleton: одно подключение к локальному хранилищу на процесс.
+
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(CACHE_DB_PATH)
+                    logger.info(f"[LocalAnimeCacheStore] - ✅ Хранилище открыто: {CACHE_DB_PATH}")
+        return cls._instance
+
+    def _import_legacy_json(self) -> None:
+        """Однократный перенос записей из старого anime_cache.json в пустое хранилище."""
+        if not LEGACY_CACHE_JSON_PATH.exists():
+            return
+
+        try:
+            with LEGACY_CACHE_JSON_PATH.open("r", encoding="utf-8") as f:
+                legacy_data = json.load(f)
+        except Exception as e:
+            logger.warning(f"[LocalAnimeCacheStore] - Не удалось прочитать {LEGACY_CACHE_JSON_PATH}: {e}")
+            return
+
+        self.set_many(legacy_data.items())
+        logger.info(f"[LocalAnimeCacheStore] - Перенесено {len(legacy_data)} записей из {LEGACY_CACHE_JSON_PATH}")
+
+    # ====== Чтение ======
+    def get(self, anime_id: int | str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM anime_cache WHERE anime_id = ?", (str(anime_id),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_since(self, seq: int) -> Tuple[list[Tuple[str, dict]], int]:
+        """
+        Возвращает записи, изменённые после seq, и новый seq для следующего вызова.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT anime_id, data, seq FROM anime_cache WHERE seq > ? ORDER BY seq", (seq,)
+            ).fetchall()
+
+        entries = []
+        for anime_id, data, row_seq in rows:
+            try:
+                entries.append((anime_id, json.loads(data)))
+            except json.JSONDecodeError as e:
+                logger.error(f"[LocalAnimeCacheStore][load_since] ❌ Битая запись anime_id={anime_id}: {e}")
+            seq = row_seq
+
+        return entries, seq
+
+    # ====== Запись ======
+    def set(self, anime_id: int | str, data: dict) -> None:
+        self.set_many([(anime_id, data)])
+
+    def set_many(self, entries: Iterable[Tuple[int | str, dict | str]]) -> int:
+        """
+        Записывает пачку (anime_id, data) одной транзакцией.
+        data может быть словарём или уже сериализованной JSON-строкой (приводится к dump_anime_data).
+        Записи, данные которых не изменились, не перезаписываются и не получают новый seq.
+
+        :return: количество добавленных или изменённых строк
+        """
+        with self._lock:
+            rows = []
+            for anime_id, data in entries:
+                self._seq += 1
+                payload = dump_anime_data(data)
+                rows.append((str(anime_id), payload, self._seq))
+
+            if not rows:
+                return 0
+
+            self._conn.execute("BEGIN")
+            try:
+                changed = self._conn.total_changes
+                self._conn.executemany(
+                    """
+                    INSERT INTO anime_cache (anime_id, data, seq) VALUES (?, ?, ?)
+                    ON CONFLICT (anime_id) DO UPDATE SET data = excluded.data, seq = excluded.seq
+                    WHERE anime_cache.data IS NOT excluded.data
+                    """,
+                    rows
+                )
+                changed = self._conn.total_changes - changed
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return changed
+
+    # ====== Служебные значения ======
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+
+    # ====== Топ по году ======
+    def get_top_by_year(self, year: int) -> Optional[Tuple[list[dict], float]]:
+        """
+        Возвращает (список аниме по убыванию оценки, время обновления в unix-секундах) или None, если года нет.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, refreshed_at FROM top_by_year WHERE year = ?", (year,)
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def get_top_by_year_refreshed(self) -> dict[int, float]:
+        """Возвращает {год: время обновления} для всех материализованных лет."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT year, refreshed_at FROM top_by_year").fetchall())
+
+    def set_top_by_year(self, year: int, animes: list[dict]) -> None:
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO top_by_year (year, data, refreshed_at) VALUES (?, ?, ?)
+                ON CONFLICT (year) DO UPDATE SET data = excluded.data, refreshed_at = excluded.refreshed_at
+                """,
+                (year, json.dumps(animes, ensure_ascii=False), time.time())
+            )
+
+
+def get_local_anime_cache_store() -> LocalAnimeCacheStore:
+    """
+    Получение локального хранилища аниме кэша
+    :return: объект LocalAnimeCacheStore
+    """
+    return LocalAnimeCacheStore.get_instance()
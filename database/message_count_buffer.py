@@ -0,0 +1,138 @@
+import asyncio
+import datetime
+from typing import Optional
+
+import asyncpg
+
+from _configs.config import get_config
+from _configs.log_config import logger
+from database.cache_invalidation import get_cache_invalidation_bus
+
+
+cfg = get_config()
+
+FLUSH_INTERVAL = cfg.database_config.message_count_flush_interval
+
+
+class MessageCountBuffer:
+    """
+    Write-behind счётчик сообщений: инкременты копятся в памяти и раз в FLUSH_INTERVAL секунд
+    пишутся в chat_users одним запросом на всех пользователей.
+
+    На пользователя хранится (день последнего сообщения, сообщений за этот день, всего сообщений),
+    смена дня (в том числе между буфером и БД) разбирается в SQL.
+    Запись — атомарный upsert: отсутствующий пользователь создаётся с базовой информацией из последнего сообщения.
+    """
+
+    def __init__(self, pool: asyncpg.Pool):
+        self._pool = pool
+        self._pending: dict[int, tuple[datetime.date, int, int]] = {}
+        self._profiles: dict[int, tuple[Optional[str], Optional[str], Optional[str]]] = {}
+        self._flush_lock = asyncio.Lock()
+
+    def add(
+        self,
+        user_id: int,
+        username: Optional[str] = None,
+        first_name: Optional[str] = None,
+        last_name: Optional[str] = None,
+        day: Optional[datetime.date] = None
+    ) -> None:
+        day = day or datetime.datetime.utcnow().date()
+        self._profiles[user_id] = (username, first_name, last_name)
+        pending = self._pending.get(user_id)
+
+        if pending is None:
+            self._pending[user_id] = (day, 1, 1)
+        else:
+            pending_day, today, total = pending
+            if day == pending_day:
+                self._pending[user_id] = (day, today + 1, total + 1)
+            else:
+                self._pending[user_id] = (max(day, pending_day), 1 if day > pending_day else today, total + 1)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._pending
+
+    def _restore(self, batch: dict[int, tuple[datetime.date, int, int]], profiles: dict) -> None:
+        """Возвращает неудачно записанную пачку в буфер, объединяя с накопленным за время записи."""
+        for user_id, profile in profiles.items():
+            self._profiles.setdefault(user_id, profile)
+
+        for user_id, (day, today, total) in batch.items():
+            newer = self._pending.get(user_id)
+            if newer is None:
+                self._pending[user_id] = (day, today, total)
+            elif newer[0] == day:
+                self._pending[user_id] = (day, today + newer[1], total + newer[2])
+            else:
+                # За время записи наступил новый день — "сегодня" берём из более свежих данных
+                self._pending[user_id] = (newer[0], newer[1], total + newer[2])
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            batch, self._pending = self._pending, {}
+            profiles, self._profiles = self._profiles, {}
+            user_ids = list(batch)
+            days = [batch[user_id][0] for user_id in user_ids]
+            today_counts = [batch[user_id][1] for user_id in user_ids]
+            total_counts = [batch[user_id][2] for user_id in user_ids]
+            usernames = [profiles.get(user_id, (None, None, None))[0] for user_id in user_ids]
+            first_names = [profiles.get(user_id, (None, None, None))[1] for user_id in user_ids]
+            last_names = [profiles.get(user_id, (None, None, None))[2] for user_id in user_ids]
+
+            try:
+                async with self._pool.acquire() as connection:
+                    rows = await connection.fetch(
+                        """
+                        INSERT INTO chat_users AS u (
+                            user_id, username, first_name, last_name, access_lvl,
+                            messages_today, total_messages, last_message_day
+                        )
+                        SELECT b.user_id, b.username, b.first_name, b.last_name, 0,
+                               b.today_count, b.total_count, b.day
+                        FROM unnest(
+                            $1::bigint[], $2::date[], $3::int[], $4::int[], $5::text[], $6::text[], $7::text[]
+                        ) AS b(user_id, day, today_count, total_count, username, first_name, last_name)
+                        ON CONFLICT (user_id) DO UPDATE SET
+                            total_messages = COALESCE(u.total_messages, 0) + EXCLUDED.total_messages,
+                            messages_today = CASE
+                                WHEN u.last_message_day = EXCLUDED.last_message_day
+                                    THEN COALESCE(u.messages_today, 0) + EXCLUDED.messages_today
+                                ELSE EXCLUDED.messages_today
+                            END,
+                            last_message_day = EXCLUDED.last_message_day
+                        RETURNING u.user_id, (xmax = 0) AS inserted
+                        """,
+                        user_ids, days, today_counts, total_counts, usernames, first_names, last_names
+                    )
+            except Exception as err:
+                self._restore(batch, profiles)
+                logger.error(f"[MessageCountBuffer] - ❌ Ошибка записи счётчиков ({len(batch)} пользователей): {err}")
+                return
+
+            new_users = [row['user_id'] for row in rows if row['inserted']]
+            logger.debug(f"[MessageCountBuffer] - ✅ Записаны счётчики сообщений: {len(batch)} пользователей, "
+                         f"новых: {len(new_users)}")
+
+            # До вставки в кэше пользователя мог осесть None
+            bus = get_cache_invalidation_bus()
+            for user_id in new_users:
+                await bus.publish("user", user_id)
+
+    async def run(self) -> None:
+        """
+        Фоновая задача периодической записи. При отмене (остановка бота) делает финальную запись.
+        """
+        try:
+            while True:
+                await asyncio.sleep(FLUSH_INTERVAL)
+                await self.flush()
+        finally:
+            await self.flush()
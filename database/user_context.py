@@ -0,0 +1,71 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, Optional
+
+from _configs.log_config import logger
+
+if TYPE_CHECKING:
+    from database.users_data_repository import UsersDataRepository
+
+
+class UserContext:
+    """
+    Данные отправителя в рамках одного апдейта.
+
+    Строка chat_users читается лениво — один раз при первом обращении, дальше значения берутся из памяти.
+    Изменения через set() копятся и записываются одним UPDATE в flush() (вызывает UsersDataMiddleware
+    по завершении обработки апдейта).
+    """
+
+    def __init__(self, users_data: "UsersDataRepository", user_id: int):
+        self.users_data = users_data
+        self.user_id = user_id
+        self._row: Optional[dict] = None
+        self._loaded = False
+        self._dirty: dict[str, Any] = {}
+        self._load_lock = asyncio.Lock()
+
+    async def load(self) -> Optional[dict]:
+        """Строка пользователя (None, если пользователя нет в базе)."""
+        if not self._loaded:
+            async with self._load_lock:
+                if not self._loaded:
+                    self._row = await self.users_data.get_user_row(self.user_id)
+                    self._loaded = True
+        return self._row
+
+    async def exists(self) -> bool:
+        return await self.load() is not None
+
+    async def get(self, field_name: str, default: Any = None) -> Any:
+        if field_name in self._dirty:
+            return self._dirty[field_name]
+
+        row = await self.load()
+        if row is None:
+            return default
+
+        value = row.get(field_name)
+        return default if value is None else value
+
+    def set(self, field_name: str, value: Any) -> None:
+        self._dirty[field_name] = value
+
+    async def flush(self) -> None:
+        """Записывает накопленные изменения одним запросом."""
+        if not self._dirty:
+            return
+
+        changes, self._dirty = self._dirty, {}
+
+        if self.user_id in self.users_data.message_counter:
+            # Новый пользователь появится в chat_users только после записи буфера счётчиков
+            await self.users_data.message_counter.flush()
+
+        if not await self.users_data.update_fields(self.user_id, changes):
+            logger.warning(f"[UserContext] - ❌ Поля {sorted(changes)} для user_id={self.user_id} не записаны")
+            return
+
+        if self._row is not None:
+            self._row.update(changes)
+
+        logger.debug(f"[UserContext] - ✅ Записаны поля {sorted(changes)} для user_id={self.user_id}")
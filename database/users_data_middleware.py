@@ -2,8 +2,14 @@ from typing import Callable, Awaitable, Dict, Any
 from aiogram.types import TelegramObject
 from aiogram import Bot, Dispatcher, BaseMiddleware
 
+from database.user_context import UserContext
+
 
 class UsersDataMiddleware(BaseMiddleware):
+    """
+    Пробрасывает в хендлеры репозиторий (users_data) и данные отправителя апдейта (user_ctx).
+    user_ctx читает строку пользователя лениво и один раз; изменения записываются одним запросом после хендлера.
+    """
     def __init__(self, users_data):
         self.users_data = users_data
 
@@ -14,4 +20,13 @@ class UsersDataMiddleware(BaseMiddleware):
         data: Dict[str, Any]
     ) -> Any:
         data["users_data"] = self.users_data
-        return await handler(event, data)
+
+        event_from_user = data.get("event_from_user")
+        user_ctx = UserContext(self.users_data, event_from_user.id) if event_from_user else None
+        data["user_ctx"] = user_ctx
+
+        try:
+            return await handler(event, data)
+        finally:
+            if user_ctx is not None:
+                await user_ctx.flush()
@@ -3,27 +3,42 @@ import datetime
 import random
 
 import asyncpg
-from aiocache import cached, Cache
+from aiocache import cached
 
 from _configs.config import get_config
 from _configs.log_config import logger
 from data.funny_names import adjectives, nouns
+from database.cache_invalidation import get_cache_invalidation_bus
+from database.message_count_buffer import MessageCountBuffer
+from database.user_context import UserContext
 
 cfg = get_config()
 
 LIMIT_WARNINGS = cfg.bot_config.limit_warnings
+USER_CACHE_TTL = cfg.bot_config.user_cache_ttl
 DB_USER = cfg.database_config.db_user
 DB_PASSWORD = cfg.database_config.db_password
 DB_HOST = cfg.database_config.db_host
 DB_PORT = cfg.database_config.db_port
 DB_NAME = cfg.database_config.db_name
 
+# Допустимые для чтения/записи колонки chat_users (имена подставляются в SQL — только из этого списка)
+USER_FIELDS = frozenset({
+    'username', 'first_name', 'last_name', 'display_name_mod', 'icon_file_id',
+    'first_login_date', 'access_lvl', 'warnings', 'total_messages', 'messages_today',
+    'avg_messages_per_day', 'last_message_date', 'anime_name', 'last_update_anime_name',
+    'admin_note', 'marital_status', 'marital_status_from', 'divorce_from', 'last_message_day'
+})
+# Поля с кэшем в процессе: при записи рассылается инвалидация по соответствующему scope
+CACHED_USER_FIELDS = ('username', 'access_lvl')
+
 class UsersDataRepository:
     _instance = None
     _lock = asyncio.Lock()
 
     def __init__(self, pool):
         self.pool = pool
+        self.message_counter = MessageCountBuffer(pool)
 
     @classmethod
     async def create(cls):
@@ -68,14 +83,7 @@ class UsersDataRepository:
 
     # ====== Универсальный сеттер ======
     async def _update_field(self, user_id: int, field_name: str, value):
-        allowed_fields = {
-            'username', 'first_name', 'last_name', 'display_name_mod', 'icon_file_id',
-            'first_login_date', 'access_lvl', 'warnings', 'total_messages', 'messages_today',
-            'avg_messages_per_day', 'last_message_date', 'anime_name', 'last_update_anime_name',
-            'admin_note', 'marital_status', 'marital_status_from', 'divorce_from', 'last_message_day'
-        }
-
-        if field_name not in allowed_fields:
+        if field_name not in USER_FIELDS:
             logger.warning(f"[_UpdateField] - 🔁 Попытка обновить недопустимое поле: {field_name}")
             return
 
@@ -90,11 +98,81 @@ class UsersDataRepository:
         except Exception as err:
             logger.error(f"[_UpdateField] - ❌ Ошибка при обновлении {field_name} для user_id={user_id}: {err}")
 
+    async def update_fields(self, user_id: int, values: dict) -> bool:
+        """
+        Запись нескольких полей одним UPDATE: update_fields(user_id, {'warnings': 0, 'admin_note': None}).
+        :return: True при успешной записи (False — в том числе если пользователя нет в chat_users)
+        """
+        invalid = set(values) - USER_FIELDS
+        if invalid:
+            logger.warning(f"[UpdateFields] - 🔁 Попытка обновить недопустимые поля: {sorted(invalid)}")
+            return False
+
+        if not values:
+            return True
+
+        field_names = list(values)
+        assignments = ", ".join(f"{field_name} = ${i}" for i, field_name in enumerate(field_names, start=2))
+
+        try:
+            async with self.pool.acquire() as connection:
+                query = f"UPDATE chat_users SET {assignments} WHERE user_id = $1"
+                status = await connection.execute(query, user_id, *(values[field_name] for field_name in field_names))
+
+            if status == "UPDATE 0":
+                logger.warning(f"[UpdateFields] - ⚠️ Пользователь user_id={user_id} не найден, поля {field_names} не сохранены")
+                return False
+
+            logger.violet(f"[update_fields] - ✅ Обновлены поля {field_names} для user_id={user_id}")
+        except Exception as err:
+            logger.error(f"[UpdateFields] - ❌ Ошибка при обновлении {field_names} для user_id={user_id}: {err}")
+            return False
+
+        for scope in CACHED_USER_FIELDS:
+            if scope in values:
+                await get_cache_invalidation_bus().publish(scope, user_id)
+        return True
+
+    async def update_fields_by_username(self, username: str, values: dict) -> int | None:
+        """
+        Поиск пользователя по username и запись полей одним запросом (для админ-команд вида /cmd @username ...).
+        :return: user_id обновлённого пользователя или None, если не найден / ошибка
+        """
+        invalid = set(values) - USER_FIELDS
+        if invalid or not values:
+            logger.warning(f"[UpdateFieldsByUsername] - 🔁 Недопустимый набор полей: {sorted(values)}")
+            return None
+
+        field_names = list(values)
+        assignments = ", ".join(f"{field_name} = ${i}" for i, field_name in enumerate(field_names, start=2))
+
+        try:
+            async with self.pool.acquire() as connection:
+                query = f"""
+                    UPDATE chat_users SET {assignments}
+                    WHERE user_id = (SELECT user_id FROM chat_users WHERE username = $1 LIMIT 1)
+                    RETURNING user_id
+                """
+                user_id = await connection.fetchval(query, username, *(values[field_name] for field_name in field_names))
+        except Exception as err:
+            logger.error(f"[UpdateFieldsByUsername] - ❌ Ошибка при обновлении {field_names} для @{username}: {err}")
+            return None
+
+        if user_id is None:
+            logger.debug(f"[UpdateFieldsByUsername] - Пользователь @{username} не найден")
+            return None
+
+        logger.violet(f"[update_fields_by_username] - ✅ Обновлены поля {field_names} для @{username} (user_id={user_id})")
+        for scope in CACHED_USER_FIELDS:
+            if scope in values:
+                await get_cache_invalidation_bus().publish(scope, user_id)
+        return user_id
+
     # ====== Сеттеры ======
     async def set_username(self, user_id, username):
         logger.debug(f"[UserData] ✅ Установлено поле username для user_id={user_id}: {username}")
         await self._update_field(user_id, 'username', username)
-        await Cache().delete(f"username:{user_id}")
+        await get_cache_invalidation_bus().publish("username", user_id)
 
 
     async def set_first_name(self, user_id, first_name):
@@ -120,7 +198,7 @@ class UsersDataRepository:
     async def set_access_lvl(self, user_id, access_lvl):
         logger.debug(f"[UserData] ✅ Установлено поле access_lvl для user_id={user_id}: {access_lvl}")
         await self._update_field(user_id, 'access_lvl', access_lvl)
-        await Cache().delete(f"access_lvl:{user_id}")
+        await get_cache_invalidation_bus().publish("access_lvl", user_id)
 
     async def set_warnings(self, user_id, warnings):
         logger.debug(f"[UserData] ✅ Установлено поле warnings для user_id={user_id}: {warnings}")
@@ -166,8 +244,14 @@ class UsersDataRepository:
         await self._update_field(user_id, 'divorce_from', divorce_from)
 
     # ====== Особые сеттеры ======
-    async def set_anime_name(self, user_id: int):
-        last_update = await self._get_field(user_id, 'last_update_anime_name')
+    async def set_anime_name(self, user_id: int, user_ctx: UserContext = None):
+        """
+        Генерирует новое аниме-имя (не чаще раза в минуту).
+        С user_ctx чтение и запись идут через данные апдейта — без отдельных запросов к БД.
+        """
+        own_ctx = user_ctx is None
+        user_ctx = user_ctx or UserContext(self, user_id)
+        last_update = await user_ctx.get('last_update_anime_name')
 
         if last_update:
             try:
@@ -182,8 +266,10 @@ class UsersDataRepository:
         anime_name = self.__generate_anime_name()
         now = datetime.datetime.now().isoformat()
 
-        await self._update_field(user_id, 'anime_name', anime_name)
-        await self._update_field(user_id, 'last_update_anime_name', now)
+        user_ctx.set('anime_name', anime_name)
+        user_ctx.set('last_update_anime_name', now)
+        if own_ctx:
+            await user_ctx.flush()
 
         logger.debug(f"[SetAnimeName] - ✅ Аниме-имя обновлено для user_id={user_id}: {anime_name}")
         return anime_name
@@ -192,14 +278,7 @@ class UsersDataRepository:
     async def _get_field(self, user_id: int, field_name: str):
         try:
             # Строгая проверка допустимых полей
-            allowed_fields = {
-                'username', 'first_name', 'last_name', 'display_name_mod', 'icon_file_id',
-                'first_login_date', 'access_lvl', 'warnings', 'total_messages', 'messages_today',
-                'avg_messages_per_day', 'last_message_date', 'anime_name', 'last_update_anime_name',
-                'admin_note', 'marital_status', 'marital_status_from', 'divorce_from', 'last_message_day'
-            }
-
-            if field_name not in allowed_fields:
+            if field_name not in USER_FIELDS:
                 logger.warning(f"[UserData] ❌‼ Попытка доступа к недопустимому полю: {field_name}")
                 return None
 
@@ -213,6 +292,32 @@ class UsersDataRepository:
             return None
 
     # ====== Геттеры ======
+    async def get_fields(self, user_id: int, fields) -> dict | None:
+        """
+        Несколько полей пользователя одним запросом: get_fields(user_id, ['warnings', 'access_lvl']).
+        :return: {поле: значение} или None, если пользователя нет
+        """
+        fields = list(fields)
+        invalid = set(fields) - USER_FIELDS
+        if invalid:
+            logger.warning(f"[UserData] ❌‼ Попытка доступа к недопустимым полям: {sorted(invalid)}")
+            return None
+
+        try:
+            async with self.pool.acquire() as connection:
+                query = f"SELECT {', '.join(fields)} FROM chat_users WHERE user_id = $1"
+                result = await connection.fetchrow(query, user_id)
+                return dict(result) if result else None
+        except Exception as err:
+            logger.error(f"[UserData] ❌ Ошибка при получении полей {fields} для user_id={user_id}: {err}")
+            return None
+
+    async def get_user_row(self, user_id: int):
+        """
+        Все поля USER_FIELDS пользователя одним запросом (None, если пользователя нет).
+        """
+        return await self.get_fields(user_id, sorted(USER_FIELDS))
+
     async def get_user_base_info(self, user_id: int):
         fields = [
             "username", "first_name", "display_name_mod",
@@ -221,16 +326,7 @@ class UsersDataRepository:
             "last_message_date", "anime_name", "admin_note",
             "messages_today"
         ]
-        field_list = ", ".join(fields)
-
-        try:
-            async with self.pool.acquire() as connection:
-                query = f"SELECT {field_list} FROM chat_users WHERE user_id = $1"
-                result = await connection.fetchrow(query, user_id)
-                return dict(result) if result else None
-        except Exception as err:
-            logger.error(f"[UserData] ❌ Ошибка при получении базовой информации для user_id={user_id}: {err}")
-            return None
+        return await self.get_fields(user_id, fields)
 
     async def get_user_id(self, username: str):
         try:
@@ -242,7 +338,7 @@ class UsersDataRepository:
             logger.error(f"[UserData] ❌ Ошибка при получении user_id по username='{username}': {err}")
             return None
 
-    @cached(ttl=60, key_builder=lambda f, self, user_id: f"username:{user_id}")
+    @cached(ttl=USER_CACHE_TTL, key_builder=lambda f, self, user_id: f"username:{user_id}")
     async def get_username(self, user_id):
         logger.debug(f"[UserData] ✅ Получение username для user_id={user_id}")
         return await self._get_field(user_id, 'username')
@@ -267,7 +363,7 @@ class UsersDataRepository:
         logger.debug(f"[UserData] ✅ Получение first_login_date для user_id={user_id}")
         return await self._get_field(user_id, 'first_login_date')
 
-    @cached(ttl=60, key_builder=lambda f, self, user_id: f"access_lvl:{user_id}")
+    @cached(ttl=USER_CACHE_TTL, key_builder=lambda f, self, user_id: f"access_lvl:{user_id}")
     async def get_access_lvl(self, user_id):
         logger.debug(f"[UserData] ✅ Получение access_lvl для user_id={user_id}")
         value = await self._get_field(user_id, 'access_lvl')
@@ -348,6 +444,9 @@ class UsersDataRepository:
 
                 logger.info(f"[AddNewUser] - ✅ Добавлен новый пользователь: user_id={user_id}")
 
+            # До вставки в кэше мог осесть None
+            await get_cache_invalidation_bus().publish("user", user_id)
+
             return user_id, username, first_name, last_name, access_lvl
 
         except Exception as err:
@@ -368,44 +467,28 @@ class UsersDataRepository:
                 await connection.execute(query, user_id, username, first_name, last_name)
 
                 logger.debug(f"[update_user_base_info] - ✅ Обновлена/создана запись user_id={user_id}")
-                return True
+
+            await get_cache_invalidation_bus().publish("user", user_id)
+            return True
 
         except Exception as err:
             logger.error(f"[update_user_base_info] ❌ Ошибка: {err}")
             return False
 
-    async def increment_message_count(self, user_id: int):
-        today_date = datetime.datetime.utcnow().date()
-
-        try:
-            async with self.pool.acquire() as connection:
-                row = await connection.fetchrow(
-                    "SELECT last_message_day FROM chat_users WHERE user_id = $1",
-                    user_id
-                )
-                last_day = row['last_message_day'] if row and row['last_message_day'] else None
-
-                if last_day != today_date:
-                    await connection.execute("""
-                        UPDATE chat_users
-                        SET messages_today = 1,
-                            total_messages = total_messages + 1,
-                            last_message_day = $1
-                        WHERE user_id = $2
-                    """, today_date, user_id)
-                else:
-                    await connection.execute("""
-                        UPDATE chat_users
-                        SET messages_today = messages_today + 1,
-                            total_messages = total_messages + 1
-                        WHERE user_id = $1
-                    """, user_id)
-
-                logger.violet(f"[increment_message_count] - ✅ Успешный коммит (автокоммит в asyncpg)")
-                logger.debug(f"[UserData] ✅ Сообщения инкрементированы для user_id={user_id}")
-
-        except Exception as err:
-            logger.error(f"[increment_message_count] - ❌ Ошибка при инкременте сообщений для user_id={user_id}: {err}")
+    async def increment_message_count(
+        self,
+        user_id: int,
+        username: str = None,
+        first_name: str = None,
+        last_name: str = None
+    ):
+        """
+        Учитывает сообщение пользователя. Запись в БД отложенная: счётчики копятся в MessageCountBuffer
+        и сбрасываются пачкой (см. MessageCountBuffer.run) одним upsert'ом — отсутствующий пользователь
+        создаётся с переданной базовой информацией, отдельная проверка существования не нужна.
+        """
+        self.message_counter.add(user_id, username, first_name, last_name)
+        logger.debug(f"[UserData] ✅ Сообщение учтено в буфере для user_id={user_id}")
 
     async def add_warning_to_user(self, user_id: int, points: int = 1) -> tuple[int, bool]:
         """
@@ -415,12 +498,31 @@ class UsersDataRepository:
             - итоговое количество предупреждений
             - True, если нужно банить (>= LIMIT_WARNINGS)
         """
-        current = await self._get_field(user_id, 'warnings') or 0
-        new_total = current + points
+        if user_id in self.message_counter:
+            # Новый пользователь появится в chat_users только после записи буфера счётчиков
+            await self.message_counter.flush()
+
+        # Инкремент на стороне БД: одновременные предупреждения (автофильтр + /w) не теряются
+        try:
+            async with self.pool.acquire() as connection:
+                new_total = await connection.fetchval(
+                    """
+                    UPDATE chat_users
+                    SET warnings = COALESCE(warnings, 0) + $1
+                    WHERE user_id = $2
+                    RETURNING warnings
+                    """,
+                    points, user_id
+                )
+        except Exception as err:
+            logger.error(f"[WARNINGS] ❌ Ошибка при добавлении предупреждений user_id={user_id}: {err}")
+            raise
 
-        await self._update_field(user_id, 'warnings', new_total)
+        if new_total is None:
+            logger.warning(f"[WARNINGS] ⚠️ Пользователь user_id={user_id} не найден, предупреждение не сохранено")
+            new_total = points
 
-        logger.debug(f"[WARNINGS] user_id={user_id} | было={current} | добавлено={points} | стало={new_total}")
+        logger.debug(f"[WARNINGS] user_id={user_id} | добавлено={points} | стало={new_total}")
         return new_total, new_total >= LIMIT_WARNINGS
 
     @staticmethod
@@ -450,6 +552,25 @@ class UsersDataRepository:
             return "Сломанный Ёжик"
 
 
+# ====== Инвалидация кэшей (в том числе из других процессов) ======
+async def _invalidate_cached(method, prefix: str, user_id: str | None) -> None:
+    if user_id is None:
+        await method.cache.clear()
+    else:
+        await method.cache.delete(f"{prefix}:{user_id}")
+
+
+async def _invalidate_user(user_id: str | None) -> None:
+    await _invalidate_cached(UsersDataRepository.get_username, "username", user_id)
+    await _invalidate_cached(UsersDataRepository.get_access_lvl, "access_lvl", user_id)
+
+
+_bus = get_cache_invalidation_bus()
+_bus.subscribe("username", lambda user_id: _invalidate_cached(UsersDataRepository.get_username, "username", user_id))
+_bus.subscribe("access_lvl", lambda user_id: _invalidate_cached(UsersDataRepository.get_access_lvl, "access_lvl", user_id))
+_bus.subscribe("user", _invalidate_user)
+
+
 async def init_users_data_repository():
     """
     Инициализирует создание подключения к базе данных
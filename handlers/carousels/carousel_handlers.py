@@ -115,11 +115,10 @@ async def search_anime_by_genre_carousel(message: types.Message, state: FSMConte
         if mes:
             await delete_message_safe(mes, 5)
 
-        animes = await shikimori_requests.get_data_anime_by_genre(
+        animes, is_cache = await shikimori_requests.get_data_anime_by_genre(
             genre_id=genre_id,
             min_score=min_score,
-            limit=10,
-            tries=3
+            limit=10
         )
 
         if not animes:
@@ -139,7 +138,11 @@ async def search_anime_by_genre_carousel(message: types.Message, state: FSMConte
             "owner_id": message.from_user.id
         }
         await state.update_data(carousels=carousels)
-        await send_anime_carousel_item(message, state, carousel_id)
+
+        if is_cache:
+            await send_anime_cache_carousel_item(message, state, carousel_id)
+        else:
+            await send_anime_carousel_item(message, state, carousel_id)
 
     except Exception as e:
         logger.error(f"[SSAG Handler Error] - {e}")
@@ -159,50 +162,37 @@ async def top10_anime_by_year(message: types.Message, state: FSMContext, users_d
         if mes:
             await delete_message_safe(mes, 10)
 
-        animes = shikimori_requests.get_top_anime_by_year_and_rating(
+        anime_list = await shikimori_requests.get_top_anime_by_year_and_rating(
             year=year,
             min_score=min_score,
-            attempts=3
+            limit=10
         )
 
-        logger.debug(f"[Top10Carousel] Полученные аниме: {animes}")
+        logger.debug(f"[Top10Carousel] Полученные аниме: {anime_list}")
 
-        # Проверяем, что получили список аниме
-        if not animes or not isinstance(animes, list):
+        if "error" in anime_list:
             logger.warning(f"[Top10Carousel] Не удалось получить аниме за {year} с рейтингом >= {min_score}")
             await message.reply("😢 Не удалось найти аниме по этим параметрам.")
             return
 
-        filtered = [anime for anime in animes if anime.get("score", 0) >= min_score]
-        logger.debug(f"[Top10Carousel] После фильтрации (по рейтингу {min_score}): {filtered}")
-
-        if not filtered:
+        if not anime_list:
             logger.warning(f"[Top10Carousel] Нет аниме с рейтингом >= {min_score}")
             await message.reply("😢 Не удалось найти аниме с нужным рейтингом.")
             return
 
-        anime_list = filtered[:10]
-
+        carousel_id = str(uuid.uuid4())
         data = await state.get_data()
-        last_msg_id = data.get("anime_carousel_last_message_id")
-        if last_msg_id:
-            try:
-                await message.bot.delete_message(chat_id=message.chat.id, message_id=last_msg_id)
-            except Exception:
-                pass
-
-        await state.update_data(
-            anime_carousel={
-                "animes": anime_list,
-                "title": f"ТОП 10 ({year}+)",
-                "total": len(anime_list),
-                "current_index": 0,
-                "owner_id": message.from_user.id
-            },
-            anime_carousel_last_message_id=None
-        )
+        carousels = data.get("carousels", {})
 
-        await send_anime_carousel_item(message, state)
+        carousels[carousel_id] = {
+            "animes": anime_list,
+            "title": f"ТОП 10 ({year}+)",
+            "total": len(anime_list),
+            "current_index": 0,
+            "owner_id": message.from_user.id
+        }
+        await state.update_data(carousels=carousels)
+        await send_anime_carousel_item(message, state, carousel_id)
 
     except Exception as e:
         logger.error(f"[Top10Carousel] - {e}")
@@ -241,7 +231,7 @@ async def send_anime_carousel_item(message: types.Message | types.CallbackQuery,
     genres = [g.get("russian", "") for g in anime.get("genres", [])]
     studios = [s.get("name", "") for s in anime.get("studios", [])]
 
-    result = get_kodik_response(anime_id)
+    result = await get_kodik_response(anime_id)
 
     player_url = None
     if result.status_code == 200:
@@ -322,7 +312,7 @@ async def send_anime_cache_carousel_item(message: types.Message | types.Callback
     genres = anime.get("genres", [])
     studios = anime.get("studios", [])
 
-    result = get_kodik_response(anime_id)
+    result = await get_kodik_response(anime_id)
 
     player_url = None
     if result.status_code == 200:
@@ -40,7 +40,7 @@ async def character_carousel_entry(message: types.Message, state: FSMContext, us
 
         try:
             logger.debug("[CharacterCarouselEntry] – вызываю send_data_character(%r)", name)
-            character_data = send_data_character(name)
+            character_data = await send_data_character(name)
             logger.debug("[CharacterCarouselEntry] – send_data_character вернул: %r (тип %s)",
                          character_data, type(character_data).__name__)
         except Exception as e:
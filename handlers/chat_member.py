@@ -5,6 +5,7 @@ from aiogram.types import ChatMemberUpdated
 from _configs.config import get_config
 from _configs.log_config import logger
 from data.welcome_messages import send_welcome_message
+from tools.chat_member_cache import chat_member_cache
 from tools.member_tools import send_dev_log
 
 router = Router()
@@ -20,6 +21,9 @@ async def handle_chat_member_update(update: ChatMemberUpdated, bot: Bot, users_d
     if update.chat.id != GROUP_ID:
         return
 
+    # Любое изменение статуса сбрасывает закэшированную проверку участия для inline-запросов
+    chat_member_cache.invalidate(update.new_chat_member.user.id)
+
     if update.new_chat_member.status not in {ChatMemberStatus.MEMBER, ChatMemberStatus.RESTRICTED}:
         logger.info(f"[handle_chat_member_update] - Игнорируем статус: {update.new_chat_member.status}")
         return
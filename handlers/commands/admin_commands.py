@@ -63,7 +63,7 @@ async def set_access(message: types.Message, command: F.CommandObject, users_dat
         await message.reply("🤨 Нельзя менять уровень доступа самому себе.")
         return
 
-    await users_data.set_access_lvl(target_user_id, access_lvl)
+    await users_data.update_fields(target_user_id, {'access_lvl': access_lvl})
     await message.reply(f"✅ Уровень доступа пользователя @{username} изменён на {access_lvl}.")
 
 
@@ -94,17 +94,16 @@ async def set_chat_nickname(message: types.Message, command: F.CommandObject, us
     username = parts[0].lstrip("@")
     new_nickname = parts[1].strip()
 
-    target_user_id = await users_data.get_user_id(username)
+    if not new_nickname:
+        await message.reply("⚠️ Никнейм не может быть пустым.")
+        return
+
+    target_user_id = await users_data.update_fields_by_username(username, {'display_name_mod': new_nickname})
 
     if not target_user_id:
         await message.reply(f"🙅 Пользователь @{username} не найден.")
         return
 
-    if not new_nickname:
-        await message.reply("⚠️ Никнейм не может быть пустым.")
-        return
-
-    await users_data.set_display_name_mod(target_user_id, new_nickname)
     await message.reply(f"✅ Пользователю @{username} установлен никнейм: <b>{new_nickname}</b>")
 
 
@@ -162,7 +161,7 @@ async def reset_warnings(message: types.Message, command: F.CommandObject, users
             _ = asyncio.create_task(delete_message_safe(reply, 60))
             return
 
-        await users_data.set_warnings(user_id, 0)
+        await users_data.update_fields(user_id, {'warnings': 0})
 
         reply = await message.reply(
             f'✅ <b>@{username}</b> — <b>предупреждения обнулены</b> и <b>ограничения сняты</b>.\n'
@@ -443,7 +442,7 @@ async def unban_user_command(message: types.Message, command: F.CommandObject, u
             user_id=user_id,
             permissions=permissions
         )
-        await users_data.set_warnings(user_id, 0)
+        await users_data.update_fields(user_id, {'warnings': 0})
         reply = await message.reply(f'✅ @{username} разбанен и права восстановлены')
         _ = asyncio.create_task(delete_message_safe(reply, 300))
 
@@ -540,7 +539,7 @@ async def ban_user_command(message: types.Message, command: F.CommandObject, use
             permissions=ChatPermissions(can_send_messages=False),
             until_date=until_date
         )
-        await users_data.set_warnings(user_id, 3)
+        await users_data.update_fields(user_id, {'warnings': 3})
         reply = await message.reply(f'✅ @{username} забанен на {ban_time} минут')
         _ = asyncio.create_task(delete_message_safe(reply, 300))
 
@@ -571,12 +570,11 @@ async def set_admin_note(message: types.Message, command: Command, users_data, *
     username = args[1][1:]
     note = args[2].strip()
 
-    user_id = await users_data.get_user_id(username)
+    user_id = await users_data.update_fields_by_username(username, {'admin_note': note})
     if user_id is None:
         await message.reply("❌ Пользователь не найден.")
         return
 
-    await users_data.set_admin_note(user_id, note)
     await message.reply(f"✅ Заметка обновлена для @{username}")
 
 
@@ -30,9 +30,9 @@ async def is_admin(chat_id: int, user_id: int, bot) -> bool:
 
 
 @router.message(Command('start'))
-async def join_confirmation(message: types.Message, users_data):
+async def join_confirmation(message: types.Message, users_data, user_ctx):
     user_id = message.from_user.id
-    user_info = await users_data.get_user_base_info(user_id)
+    user_info = await user_ctx.load()
 
     if user_info:
         join_confirm_text = (
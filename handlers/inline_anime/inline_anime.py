@@ -1,8 +1,10 @@
-import json
 import random
-import uuid
 from aiogram import Router, F, types, Bot
-from tools.cache_tools import get_anime_cache
+from tools.cache_tools import get_anime_cache_snapshot
+from tools.anime_search_index import normalize_title
+from tools.ttl_cache import TTLCache
+from tools.chat_member_cache import chat_member_cache
+from database.local_anime_cache_store import get_local_anime_cache_store
 from aiogram.types import (
     InlineQuery,
     InlineQueryResultArticle,
@@ -16,12 +18,11 @@ from _configs.log_config import logger
 from tools.inline_query_tools import clean_description, safe_join, build_anime_caption
 from tools.common_utils import delete_message_safe, get_player_url, get_kodik_data_for_site, get_kodik_response
 from _configs.config import get_config
-from aiogram.exceptions import TelegramBadRequest
 
 
 cfg = get_config()
 
-ANIME_CACHE_PATH = cfg.cache_config.anime_cache_path
+ANIME_CACHE_DB_PATH = cfg.cache_config.anime_cache_db_path
 BOT_URL = cfg.bot_config.bot_url
 BOT_USERNAME = cfg.bot_config.bot_username
 DEV_USERNAME = cfg.dev_config.dev_username
@@ -29,11 +30,19 @@ DEV_URL = cfg.dev_config.dev_url
 GROUP_ID = cfg.bot_config.group_id
 GROUP_URL = cfg.bot_config.group_url
 
+INLINE_RESULTS_LIMIT = 50       # Telegram принимает не более 50 результатов на inline-запрос
+INLINE_CACHE_TIME = cfg.bot_config.inline_cache_time
+
 
 router = Router()
 
+_inline_results_cache = TTLCache(
+    ttl=cfg.cache_config.inline_results_cache_ttl,
+    max_size=cfg.cache_config.inline_results_cache_max_size
+)
+
 
-logger.info(f"[inline_anime] - Путь кэша аниме -> {ANIME_CACHE_PATH}")
+logger.info(f"[inline_anime] - Путь кэша аниме -> {ANIME_CACHE_DB_PATH}")
 BASE_URL = "https://ero-no-sekai.up.railway.app/watch/?sid="
 
 
@@ -43,79 +52,80 @@ async def inline_anime_handler(inline_query: InlineQuery, bot: Bot):
     user_id = inline_query.from_user.id
 
     try:
-        member = await bot.get_chat_member(chat_id=GROUP_ID, user_id=user_id)
-        if member.status not in ("member", "administrator", "creator"):
-            raise ValueError("Не в группе")
-    except TelegramBadRequest:
-        await send_join_group_card(inline_query)
-        return
+        if not await chat_member_cache.is_member(bot, user_id):
+            await send_join_group_card(inline_query)
+            return
     except Exception as e:
         logger.error(f"[inline_anime_handler] Ошибка при проверке участия в группе: {e}")
         await send_join_group_card(inline_query)
         return
 
     query_text = inline_query.query.lower()
+    is_private = inline_query.chat_type == "private"
 
-    anime_cache = get_anime_cache()
+    logger.info(f"[inline_anime_handler] - Получен inline_query от пользователя {inline_query.from_user.id}: '{query_text}'")
 
-    logger.info(f"[inline_anime_handler] - Получен inline_query от пользователя {inline_query.from_user.id}: '{query_text}'"
-                f"\nНаличие кэша: {True if anime_cache else False}"
-                f"\nТип кэш-переменной: {type(anime_cache)}")
+    # Один снимок кэша на весь запрос: данные и индексы согласованы между собой
+    snapshot = get_anime_cache_snapshot()
 
-    if not query_text:
-        animes_list = random.sample(list(anime_cache.values()), k=min(20, len(anime_cache)))
-    else:
-        logger.violet(f"[inline_anime_handler] - Содержимое anime_cache: {json.dumps(anime_cache, indent=4, ensure_ascii=False)}")
+    # Пустой запрос — случайная подборка, её не кэшируем. Версия кэша в ключе сбрасывает выдачу при новых данных.
+    cache_key = (normalize_title(query_text), is_private, snapshot.version) if query_text else None
+    results = _inline_results_cache.get(cache_key) if cache_key else None
 
-        animes_list = []
-
-        for index, anime in enumerate(anime_cache.values()):
-            if not isinstance(anime, dict):
-                logger.error(f"[inline_anime_handler] - Элемент под индексом {index} не является словарём: {repr(anime)}")
-                continue
+    if results is None:
+        if not query_text:
+            animes_list = random.sample(snapshot.sample_pool, k=min(20, len(snapshot.sample_pool)))
+        else:
+            animes_list = snapshot.search_index.search(query_text, limit=INLINE_RESULTS_LIMIT)
 
-            russian_value = anime.get('russian')
-            name_value = anime.get('name')
+        logger.info(f"[inline_anime_handler] - Выбрано {len(animes_list)} аниме для ответа.")
 
-            if russian_value is None:
-                logger.warning(f"[inline_anime_handler] - anime[{index}] c id: {anime['id']} → ключ 'russian' отсутствует или None")
-            if name_value is None:
-                logger.warning(f"[inline_anime_handler] - anime[{index}] c id: {anime['id']} → ключ 'name' отсутствует или None")
+        results = await build_inline_results(animes_list, is_private)
 
-            russian_text = russian_value or ''
-            name_text = name_value or ''
+        if not results:
+            logger.warning(f"[inline_anime_handler] - Не найдено аниме по запросу '{query_text}'")
+            results = [build_not_found_result()]
 
-            try:
-                if query_text in russian_text.lower() or query_text in name_text.lower():
-                    logger.info(f"[inline_anime_handler] - anime[{index}] → добавлен по совпадению с запросом")
-                    animes_list.append(anime)
-            except Exception as e:
-                logger.error(f"[inline_anime_handler] - anime[{index}] → ошибка при сравнении: {e}")
-                logger.debug(f"[inline_anime_handler] - anime[{index}] → russian: {repr(russian_value)}, name: {repr(name_value)}")
+        if cache_key:
+            _inline_results_cache.set(cache_key, results)
+    else:
+        logger.debug(f"[inline_anime_handler] - Выдача из кэша для '{query_text}'. "
+                     f"Статистика: {_inline_results_cache.stats()}")
 
+    try:
+        await inline_query.answer(results=results, cache_time=INLINE_CACHE_TIME, is_personal=True)
+        logger.info("[inline_anime_handler] - Ответ на inline_query успешно отправлен.")
+    except Exception as e:
+        logger.exception(f"[inline_anime_handler] - Ошибка при отправке ответа на inline_query: {e}")
 
-    logger.info(f"[inline_anime_handler] - Выбрано {len(animes_list)} аниме для ответа.")
 
-    results = []
+async def build_inline_results(animes_list: list[dict], is_private: bool) -> list[InlineQueryResultArticle]:
+    """
+    Собирает InlineQueryResultArticle для списка аниме.
+    id результата детерминирован (anime_id), поэтому одинаковые запросы дают одинаковую выдачу.
+    В личных чатах наличие плеера проверяется через KodikAPI — параллельно для всей выдачи.
+    """
+    animes_list = [anime for anime in animes_list if isinstance(anime, dict)]
 
-    for anime in animes_list:
+    if is_private:
+        kodik_responses = await asyncio.gather(*(get_kodik_response(anime.get('id')) for anime in animes_list))
+    else:
+        kodik_responses = [None] * len(animes_list)
 
-        if not isinstance(anime, dict):
-            logger.error(f"[inline_anime_handler] - Ошибка: anime не является словарём: {repr(anime)}")
-            continue  # Пропустить этот элемент
+    results = []
 
-        unique_id = str(uuid.uuid4())
+    for anime, kodik_response in zip(animes_list, kodik_responses):
         anime_id = str(anime.get("id"))
 
-        logger.debug(json.dumps(anime, indent=4, ensure_ascii=False))
-
-        genres = anime.get("genres", [])
-        studios = anime.get("studios", [])
-        description = clean_description(anime.get("description", ""))[:300]
+        title = anime.get('russian') or anime.get('name') or "Без названия"
+        short_description = clean_description(anime.get("description", ""))[:100] + "..."
         poster_preview_url = anime.get('mainUrl')
 
-        if inline_query.chat_type == "private":
+        if is_private:
             # Обработка личных чатов
+            genres = anime.get("genres", [])
+            studios = anime.get("studios", [])
+            description = clean_description(anime.get("description", ""))[:300]
 
             message_text = (
                 f"🎬 <b>{anime.get('name', 'Без названия')}</b> (<i>{anime.get('russian', '...')}</i>)\n"
@@ -128,23 +138,13 @@ async def inline_anime_handler(inline_query: InlineQuery, bot: Bot):
                 f"🔗 <a href='{anime.get('url', '')}/characters'>Персонажи</a>"
             )
 
-
-
-            result = get_kodik_response(anime.get('id'))
             markup = None
-
-            if result.status_code == 200:
-                result = result.json()
-                try:
-
-                    markup = InlineKeyboardMarkup(inline_keyboard=[
-                        [
-                            InlineKeyboardButton(text="▶ Смотреть", url=BASE_URL+anime_id)
-                        ]
-                    ])
-
-                except Exception as e:
-                    logger.error(f"[inline_anime_handler] - Ошибка при запросе player_url {e} \nplayer_url={json.dumps(result, indent=4, ensure_ascii=False)}")
+            if kodik_response.status_code == 200:
+                markup = InlineKeyboardMarkup(inline_keyboard=[
+                    [
+                        InlineKeyboardButton(text="▶ Смотреть", url=BASE_URL+anime_id)
+                    ]
+                ])
 
             input_message_content = InputTextMessageContent(
                 message_text=message_text,
@@ -152,71 +152,51 @@ async def inline_anime_handler(inline_query: InlineQuery, bot: Bot):
                 disable_web_page_preview=False
             )
 
-            results.append(
-                InlineQueryResultArticle(
-                    id=unique_id,
-                    title=anime.get('russian') or anime.get('name') or "Без названия",
-                    description=clean_description(anime.get("description", ""))[:100] + "...",
-                    input_message_content=input_message_content,
-                    reply_markup=markup,
-                    thumb_url=poster_preview_url,
-                    thumb_width=128,
-                    thumb_height=200
-                )
-            )
-
         else:
             # Обработка запросов внутри групп в которых есть бот
+            markup = None
             input_message_content = InputTextMessageContent(
                 message_text=anime_id,
                 parse_mode=ParseMode.HTML,
                 disable_web_page_preview=True
             )
 
-            results.append(
-                InlineQueryResultArticle(
-                    id=unique_id,
-                    title=anime.get('russian') or anime.get('name') or "Без названия",
-                    description=(clean_description(anime.get("description", ""))[:100] + "..."),
-                    input_message_content=input_message_content,
-                    thumb_url=poster_preview_url,
-                    thumb_width=128,
-                    thumb_height=200
-                )
-            )
-
-    if not results:
-        logger.warning(f"[inline_anime_handler] - Не найдено аниме по запросу '{query_text}'")
-
-        unique_id = str(uuid.uuid4())
-
-        input_message_content = InputTextMessageContent(
-            message_text=(
-                f"К сожалению, что-то пошло не так, и я не смог распознать запрос.\n"
-                f"Обратись к {DEV_USERNAME}, возможно, он объяснит причину.\n"
-                f"А ещё быстрее — <a href='{BOT_URL}'>обратиться к боту</a> с командой <code>/ssa (название)</code>."
-            ),
-            parse_mode=ParseMode.HTML,
-            disable_web_page_preview=True
-        )
-
         results.append(
             InlineQueryResultArticle(
-                id=unique_id,
-                title="К сожалению, что-то пошло не так",
-                description="Не расстраивайся! Ты всегда можешь получить карусель в чате с ботом, используя команду '/ssa (название)'",
+                id=f"anime:{anime_id}",
+                title=title,
+                description=short_description,
                 input_message_content=input_message_content,
-                thumb_url='https://ero-no-sekai.up.railway.app/static/pictures/404_preview.jpg',
+                reply_markup=markup,
+                thumb_url=poster_preview_url,
                 thumb_width=128,
                 thumb_height=200
             )
         )
 
-    try:
-        await inline_query.answer(results=results, cache_time=0)
-        logger.info("[inline_anime_handler] - Ответ на inline_query успешно отправлен.")
-    except Exception as e:
-        logger.exception(f"[inline_anime_handler] - Ошибка при отправке ответа на inline_query: {e}")
+    return results
+
+
+def build_not_found_result() -> InlineQueryResultArticle:
+    input_message_content = InputTextMessageContent(
+        message_text=(
+            f"К сожалению, что-то пошло не так, и я не смог распознать запрос.\n"
+            f"Обратись к {DEV_USERNAME}, возможно, он объяснит причину.\n"
+            f"А ещё быстрее — <a href='{BOT_URL}'>обратиться к боту</a> с командой <code>/ssa (название)</code>."
+        ),
+        parse_mode=ParseMode.HTML,
+        disable_web_page_preview=True
+    )
+
+    return InlineQueryResultArticle(
+        id="not_found",
+        title="К сожалению, что-то пошло не так",
+        description="Не расстраивайся! Ты всегда можешь получить карусель в чате с ботом, используя команду '/ssa (название)'",
+        input_message_content=input_message_content,
+        thumb_url='https://ero-no-sekai.up.railway.app/static/pictures/404_preview.jpg',
+        thumb_width=128,
+        thumb_height=200
+    )
 
 
 
@@ -225,15 +205,16 @@ async def inline_anime_handler(inline_query: InlineQuery, bot: Bot):
 async def anime_selected_handler(message: types.Message, bot: Bot) -> None:
     anime_id = message.text.strip()
 
-    anime_cache = get_anime_cache()
-
-    anime = anime_cache.get(anime_id)
+    # Читаем из снимка в памяти; в хранилище (в отдельном потоке) — только если снимок ещё не подтянул запись
+    anime = get_anime_cache_snapshot().entries.get(anime_id)
+    if anime is None:
+        anime = await asyncio.to_thread(get_local_anime_cache_store().get, anime_id)
 
     if not anime:
         await message.reply("😕 Аниме не найдено.")
         return
 
-    caption, markup = build_anime_caption(anime)
+    caption, markup = await build_anime_caption(anime)
     poster_url = anime["poster"]
 
     try:
@@ -277,7 +258,7 @@ async def anime_selected_handler(message: types.Message, bot: Bot) -> None:
 async def send_join_group_card(inline_query: InlineQuery):
     results = [
         InlineQueryResultArticle(
-            id=str(uuid.uuid4()),
+            id="join_group",
             title="Прости, но, доступ ограничен",
             description="Функция доступна исключительно участникам нашей группы.",
             input_message_content=InputTextMessageContent(
@@ -26,11 +26,11 @@ LIMIT_WARNINGS = cfg.bot_config.limit_warnings
 
 
 @router.message(F.text.regexp(r"и+\s*горь кто я", flags=re.IGNORECASE))
-async def handle_who_am_i(message: Message, users_data):
+async def handle_who_am_i(message: Message, users_data, user_ctx):
     if message:
         _ = asyncio.create_task(delete_message_safe(message, TIMER_REMOVAL))
-    await users_data.set_anime_name(message.from_user.id)
-    funny_name = await users_data.get_anime_name(message.from_user.id)
+    await users_data.set_anime_name(message.from_user.id, user_ctx)
+    funny_name = await user_ctx.get('anime_name')
     if message:
         message_bot = await message.reply(f"Сегодня ты: {funny_name}")
         if message_bot:
@@ -214,7 +214,6 @@ async def filter_bad_words(message: Message, bot, users_data):
         return
 
     user_id = message.from_user.id
-    await users_data.increment_message_count(user_id)
 
     try:
         logger.debug(
@@ -224,19 +223,14 @@ async def filter_bad_words(message: Message, bot, users_data):
             f"{getattr(message.reply_to_message.forum_topic_created, 'name', 'Проблема названия топика') if message.reply_to_message and message.reply_to_message.forum_topic_created else 'Проблема названия топика'}"
         )
 
-        # === Проверка/добавление пользователя ===
-        user_exists = await users_data.get_user_id(message.from_user.username)
-
-        if user_exists is None:
-            await users_data.add_new_user(
+        # === Подсчёт сообщений (заодно создаёт пользователя, если его ещё нет) ===
+        try:
+            await users_data.increment_message_count(
                 user_id,
                 message.from_user.username,
                 message.from_user.first_name,
                 message.from_user.last_name
             )
-
-        try:
-            await users_data.increment_message_count(user_id)
         except Exception as err:
             logger.warning(f"[FilterBadWords] - Ошибка при подсчете сообщений.\n{err}")
 
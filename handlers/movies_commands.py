@@ -123,7 +123,7 @@ async def send_anime_with_anilist(message: types.Message, command: F.CommandObje
 
 @router.message(or_f(Command("ssrc"), Command("shikimori_send_random_character")))
 async def send_random_character_data(message: types.Message):
-    char_data = shikimori_requests.send_data_random_person()
+    char_data = await shikimori_requests.send_data_random_person()
 
     if not char_data:
         await message.reply("Не удалось получить данные о персонаже.")
@@ -173,7 +173,7 @@ async def repeat_random_character(callback: types.CallbackQuery):
     try:
         await callback.message.delete()
 
-        char_data = shikimori_requests.send_data_random_person()
+        char_data = await shikimori_requests.send_data_random_person()
 
         if not char_data:
             await callback.message.answer("Не удалось получить данные о персонаже.")
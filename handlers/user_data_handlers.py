@@ -45,7 +45,7 @@ async def send_me_profile(message: types.Message, users_data):
 
     except Exception as e:
         logger.exception(f"[send_me_profile] ⚠️ Ошибка генерации изображения: {e}")
-        info = await combine_user_info(user_id, users_data)
+        info = await combine_user_info(user_id, users_data, person_data)
         await message.reply(info)
 
 @router.message(or_f(Command("whois"), Command("profile")))
@@ -73,13 +73,14 @@ async def send_user_profile(message: types.Message, command: F.CommandObject, us
         await message.answer_photo(BufferedInputFile(image, filename="profile.png"))
     except Exception as e:
         logger.warning(f"⚠️ Ошибка генерации изображения профиля для {user_id}: {e}")
-        info = await combine_user_info(user_id, users_data)
+        info = await combine_user_info(user_id, users_data, person_data)
         await message.reply(info)
 
 
 # ====== Фолбэк-комбинатор текстового профиля ======
-async def combine_user_info(user_id, users_data):
-    person_data = await users_data.get_user_base_info(user_id)
+async def combine_user_info(user_id, users_data, person_data: Optional[dict] = None):
+    # Данные профиля обычно уже получены вызывающим хендлером — повторно в базу не ходим
+    person_data = person_data or await users_data.get_user_base_info(user_id)
     if not person_data:
         return "❌ Пользователь не найден."
 
@@ -13,9 +13,16 @@ from _configs import config_commands
 from _configs.config import get_config, set_config
 from _configs.config_io import load_config_from_file
 from _configs.log_config import logger
+from api.kodik_api.kodik_client import get_kodik_client
+from api.shikimori_api.anime_name_cache import anime_name_cache
+from api.shikimori_api.shikimori_client import get_shikimori_client
+from api.shikimori_api.shikimori_requests import run_top_by_year_refresher
+from api.shikimori_api.cache_warmer import run_anime_cache_warmer
 from api.supabase_api import supabase_loading_icon, supabase_uploading_icon
 from database import repositories
-from database.anime_cache_repository import init_anime_cache_repository
+from database.anime_cache_repository import init_anime_cache_repository, run_anime_cache_sync
+from database.cache_invalidation import get_cache_invalidation_bus
+from tools.cache_tools import refresh_anime_cache_snapshot, run_anime_cache_snapshot_refresher
 from database.users_data_middleware import UsersDataMiddleware
 from database.anime_cache_repository import AnimeCacheRepository
 from database.users_data_repository import init_users_data_repository
@@ -113,6 +120,14 @@ async def on_startup():
         logger.critical(f"[Startup] - ❌ Ошибка при инициализации users_data_repository: {err}")
         raise
 
+    # === Подписка на межпроцессную инвалидацию кэшей ===
+    try:
+        logger.info("[Startup] - 🔁 Подписка на инвалидацию кэшей (LISTEN/NOTIFY)...")
+        await get_cache_invalidation_bus().start(users_data_repository.pool)
+        logger.info("[Startup] - ✅ Подписка на инвалидацию кэшей запущена")
+    except Exception as err:
+        logger.error(f"[Startup] - ❌ Ошибка при подписке на инвалидацию кэшей: {err}")
+
     # === Подключение middleware ===
     try:
         logger.info("[Startup] - 🔁 Подключение UsersDataMiddleware...")
@@ -130,14 +145,32 @@ async def on_startup():
         if anime_cache_repository is None:
             raise RuntimeError("AnimeCacheRepository is None")
         repositories.set_anime_cache_repository(anime_cache_repository)
-        await anime_cache_repository.export_cache_to_file()
-        logger.info("[Startup][anime_cache_repository][export_cache_to_file] - ✅ Инициализация кэш файла")
+        await anime_cache_repository.sync_cache_to_local()
+        logger.info("[Startup][anime_cache_repository][sync_cache_to_local] - ✅ Локальный кэш синхронизирован")
+        snapshot = await refresh_anime_cache_snapshot()
+        logger.info(f"[Startup] - ✅ Снимок аниме кэша построен ({len(snapshot)} аниме)")
         logger.info("[Startup] - ✅ Регистрация anime_cache_repository")
     except Exception as err:
         logger.critical(f"[Startup] - ❌ Ошибка при инициализации anime_cache_repository: {err}")
         raise
 
 
+    # === Инициализация клиента Shikimori API ===
+    try:
+        logger.info("[Startup] - 🔁 Инициализация клиента Shikimori API...")
+        await get_shikimori_client().start()
+        logger.info("[Startup] - ✅ Клиент Shikimori API готов")
+    except Exception as err:
+        logger.error(f"[Startup] - ❌ Ошибка при инициализации клиента Shikimori API: {err}")
+
+    # === Загрузка кэша поиска по названию ===
+    try:
+        logger.info("[Startup] - 🔁 Загрузка кэша поиска по названию...")
+        await asyncio.to_thread(anime_name_cache.load)
+        logger.info(f"[Startup] - ✅ Кэш поиска по названию загружен ({len(anime_name_cache)} запросов)")
+    except Exception as err:
+        logger.error(f"[Startup] - ❌ Ошибка при загрузке кэша поиска по названию: {err}")
+
     # === Загрузка конфигурации ===
     try:
         logger.info("[Startup] - 🔁 Загрузка конфигурации...")
@@ -166,15 +199,30 @@ async def main():
     web_task = asyncio.create_task(start_web_server())
     bot_task = asyncio.create_task(dp.start_polling(bot))
 
+    # Фоновые задачи: работают, пока живы бот и веб-сервер
+    background_tasks = [
+        asyncio.create_task(run_top_by_year_refresher()),
+        asyncio.create_task(run_anime_cache_warmer()),
+        asyncio.create_task(run_anime_cache_sync(await repositories.get_anime_cache_repository())),
+        asyncio.create_task(run_anime_cache_snapshot_refresher()),
+        asyncio.create_task(repositories.get_users_data_repository().message_counter.run())
+    ]
+
     done, pending = await asyncio.wait(
         [web_task, bot_task],
         return_when=asyncio.FIRST_COMPLETED
     )
 
-    for task in pending:
+    for task in [*pending, *background_tasks]:
         task.cancel()
+    # Дожидаемся фоновых задач: буфер счётчиков сообщений делает финальную запись при отмене
+    await asyncio.gather(*background_tasks, return_exceptions=True)
 
+    await get_cache_invalidation_bus().stop()
     await bot.session.close()
+    await get_kodik_client().close()
+    await get_shikimori_client().close()
+    await anime_name_cache.flush()
     logger.info("[Main] - Все задачи завершены корректно.")
 
 
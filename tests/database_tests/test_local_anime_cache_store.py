@@ -0,0 +1,35 @@
+import json
+
+from database import local_anime_cache_store
+from database.local_anime_cache_store import LocalAnimeCacheStore
+
+
+ANIME = {"id": 1, "russian": "Атака титанов", "score": 8.5, "genres": ["Экшен"]}
+
+
+def _store(tmp_path, monkeypatch) -> LocalAnimeCacheStore:
+    monkeypatch.setattr(local_anime_cache_store, "LEGACY_CACHE_JSON_PATH", tmp_path / "missing.json")
+    return LocalAnimeCacheStore(tmp_path / "anime_cache.sqlite3")
+
+
+def test_same_data_from_postgres_is_not_rewritten(tmp_path, monkeypatch):
+    store = _store(tmp_path, monkeypatch)
+    assert store.set_many([(1, ANIME)]) == 1
+    _, seq = store.load_since(0)
+
+    # Тот же объект, каким его возвращают json (ASCII-экранирование) и jsonb (другой порядок ключей и пробелы)
+    as_json = json.dumps(ANIME)
+    as_jsonb = json.dumps(dict(reversed(list(ANIME.items()))), ensure_ascii=False, separators=(", ", ": "))
+
+    assert store.set_many([("1", as_json), ("1", as_jsonb)]) == 0
+    assert store.load_since(seq) == ([], seq)
+
+
+def test_changed_data_gets_new_seq(tmp_path, monkeypatch):
+    store = _store(tmp_path, monkeypatch)
+    store.set_many([(1, ANIME)])
+    _, seq = store.load_since(0)
+
+    assert store.set_many([(1, {**ANIME, "score": 9.0})]) == 1
+    entries, _ = store.load_since(seq)
+    assert entries == [("1", {**ANIME, "score": 9.0})]
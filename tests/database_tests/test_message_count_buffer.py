@@ -0,0 +1,96 @@
+import asyncio
+import datetime
+from contextlib import asynccontextmanager
+
+from database.message_count_buffer import MessageCountBuffer
+
+
+DAY = datetime.date(2025, 1, 1)
+NEXT_DAY = DAY + datetime.timedelta(days=1)
+
+
+class FakePool:
+    """Пул, который передаёт аргументы upsert'а в on_fetch вместо Postgres."""
+
+    def __init__(self, on_fetch):
+        self.on_fetch = on_fetch
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    async def fetch(self, query, *args):
+        return self.on_fetch(*args)
+
+
+def _flushed_rows(buffer: MessageCountBuffer) -> dict:
+    """Записывает буфер и возвращает {user_id: (day, today, total)} из аргументов запроса."""
+    rows = {}
+
+    def on_fetch(user_ids, days, today_counts, total_counts, *profiles):
+        rows.update(zip(user_ids, zip(days, today_counts, total_counts)))
+        return []
+
+    buffer._pool = FakePool(on_fetch)
+    asyncio.run(buffer.flush())
+    return rows
+
+
+def _fail_flush(buffer: MessageCountBuffer, during_write) -> None:
+    """Запись падает, а during_write успевает добавить сообщения, пока пачка "в полёте"."""
+    def on_fetch(*args):
+        during_write(buffer)
+        raise ConnectionError("connection lost")
+
+    buffer._pool = FakePool(on_fetch)
+    asyncio.run(buffer.flush())
+
+
+def test_day_rollover_sends_only_latest_day_count():
+    buffer = MessageCountBuffer(pool=None)
+    buffer.add(1, day=DAY)
+    buffer.add(1, day=DAY)
+    buffer.add(1, day=NEXT_DAY)
+
+    # SQL при смене дня заменяет messages_today на переданное значение — там должен быть только новый день
+    assert _flushed_rows(buffer) == {1: (NEXT_DAY, 1, 3)}
+
+
+def test_late_message_from_previous_day_counts_only_in_total():
+    buffer = MessageCountBuffer(pool=None)
+    buffer.add(1, day=NEXT_DAY)
+    buffer.add(1, day=DAY)
+
+    assert _flushed_rows(buffer) == {1: (NEXT_DAY, 1, 2)}
+
+
+def test_failed_batch_merges_with_messages_buffered_meanwhile():
+    buffer = MessageCountBuffer(pool=None)
+    buffer.add(1, "old_name", day=DAY)
+    buffer.add(1, "old_name", day=DAY)
+    buffer.add(2, day=DAY)
+
+    def during_write(buf):
+        buf.add(1, "new_name", day=DAY)
+        buf.add(3, day=DAY)
+
+    _fail_flush(buffer, during_write)
+
+    assert len(buffer) == 3
+    # Профиль из более свежего сообщения не затирается старым из упавшей пачки
+    assert buffer._profiles[1] == ("new_name", None, None)
+    assert _flushed_rows(buffer) == {
+        1: (DAY, 3, 3),
+        2: (DAY, 1, 1),
+        3: (DAY, 1, 1),
+    }
+
+
+def test_failed_batch_keeps_newer_day_from_messages_buffered_meanwhile():
+    buffer = MessageCountBuffer(pool=None)
+    buffer.add(1, day=DAY)
+    buffer.add(1, day=DAY)
+
+    _fail_flush(buffer, lambda buf: buf.add(1, day=NEXT_DAY))
+
+    assert _flushed_rows(buffer) == {1: (NEXT_DAY, 1, 3)}
@@ -0,0 +1,3 @@
+def make_anime(anime_id: str, score: float = 7, russian: str = None, genres: tuple = ("Экшен",)) -> dict:
+    """Минимальная запись аниме в формате локального кэша."""
+    return {"id": anime_id, "russian": russian, "name": None, "score": score, "genres": list(genres)}
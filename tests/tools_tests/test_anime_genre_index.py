@@ -0,0 +1,45 @@
+from tests.tools_tests.helpers import make_anime
+from tools.anime_genre_index import AnimeGenreIndex
+
+
+ACTION = 1
+
+
+def test_reindex_changed_score_in_same_batch():
+    index = AnimeGenreIndex()
+    index.update([("x", make_anime("x", 8))])
+
+    # Запись "y" ломает порядок хвоста до того, как переиндексируется "x"
+    index.update([("y", make_anime("y", 9)), ("x", make_anime("x", 6))])
+
+    assert len(index) == 2
+    assert index.pool_size(ACTION) == 2
+    assert index.pool_size(ACTION, min_score=7) == 1
+    assert [anime["id"] for anime in index.sample(ACTION, limit=10)] == ["y", "x"]
+
+
+def test_duplicate_id_in_batch_keeps_last():
+    index = AnimeGenreIndex()
+    index.update([("x", make_anime("x", 8)), ("x", make_anime("x", 5))])
+
+    assert index.pool_size(ACTION) == 1
+    assert index.sample(ACTION, limit=10)[0]["score"] == 5
+
+
+def test_remove():
+    index = AnimeGenreIndex()
+    index.update([("x", make_anime("x", 8)), ("y", make_anime("y", 7))])
+    index.remove("x")
+
+    assert [anime["id"] for anime in index.sample(ACTION, limit=10)] == ["y"]
+
+
+def test_with_updates_leaves_parent_untouched():
+    parent = AnimeGenreIndex()
+    parent.update([("x", make_anime("x", 8)), ("y", make_anime("y", 7))])
+
+    child = parent.with_updates([("x", make_anime("x", 5)), ("z", make_anime("z", 9))])
+
+    assert parent.pool_size(ACTION, min_score=6) == 2
+    assert [anime["id"] for anime in parent.sample(ACTION, limit=10)] == ["x", "y"]
+    assert [anime["id"] for anime in child.sample(ACTION, limit=10)] == ["z", "y", "x"]
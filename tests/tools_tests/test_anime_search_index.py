@@ -0,0 +1,25 @@
+from tests.tools_tests.helpers import make_anime
+from tools.anime_search_index import AnimeSearchIndex
+
+
+def _ids(index: AnimeSearchIndex, query: str) -> list[str]:
+    return [anime["id"] for anime in index.search(query)]
+
+
+def test_with_updates_leaves_parent_untouched():
+    parent = AnimeSearchIndex()
+    parent.update([
+        ("1", make_anime("1", russian="Атака титанов")),
+        ("2", make_anime("2", russian="Магическая битва")),
+    ])
+
+    child = parent.with_updates([
+        ("1", make_anime("1", russian="Клинок, рассекающий демонов")),
+        ("3", make_anime("3", russian="Атака на город")),
+    ])
+
+    assert _ids(parent, "атака") == ["1"]
+    assert _ids(parent, "клинок") == []
+    assert _ids(child, "атака") == ["3"]
+    assert _ids(child, "клинок") == ["1"]
+    assert _ids(child, "битва") == ["2"]
@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+from tools.token_bucket import TokenBucket
+
+
+def _elapsed(coro_factory) -> float:
+    async def run():
+        started_at = time.monotonic()
+        await coro_factory()
+        return time.monotonic() - started_at
+
+    return asyncio.run(run())
+
+
+def test_burst_is_free_and_rest_is_rate_limited():
+    bucket = TokenBucket(rate=20, capacity=2)
+
+    assert _elapsed(lambda: asyncio.gather(bucket.acquire(), bucket.acquire())) < 0.03
+
+    # Корзина пуста: ещё два токена приходят с интервалом 1 / rate = 0.05 с
+    elapsed = _elapsed(lambda: asyncio.gather(bucket.acquire(), bucket.acquire()))
+    assert 0.09 <= elapsed < 0.5
+    assert bucket.stats()["acquired"] == 4
+    assert bucket.stats()["waiting"] == 0
+
+
+def test_pause_blocks_even_with_tokens_left():
+    bucket = TokenBucket(rate=1000, capacity=10)
+    bucket.pause(0.2)
+
+    assert 0.19 <= _elapsed(bucket.acquire) < 0.5
+
+
+def test_pause_extends_but_never_shortens():
+    bucket = TokenBucket(rate=1000, capacity=10)
+    bucket.pause(0.3)
+    bucket.pause(0.05)
+
+    assert bucket.stats()["paused_for"] > 0.2
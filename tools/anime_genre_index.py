@@ -0,0 +1,122 @@
+import bisect
+import random
+from typing import Iterable, Tuple
+
+from _configs.log_config import logger
+from data.shikimori_genres import GENRES
+
+
+def _score(anime: dict) -> float:
+    try:
+        return float(anime.get("score") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class AnimeGenreIndex:
+    """
+    Индекс "жанр → аниме" по локальному кэшу, каждый список отсортирован по убыванию оценки.
+
+    Жанры в кэше хранятся русскими названиями — в id они переводятся по словарю data/shikimori_genres.GENRES.
+    Выборка "жанр + оценка не ниже N" — это префикс отсортированного списка (bisect), без перебора кэша.
+    with_updates() строит новый индекс поверх текущего, не меняя его (для неизменяемых снимков кэша).
+    """
+
+    def __init__(self):
+        self._entries: dict[str, dict] = {}
+        self._postings: dict[int, list[tuple[float, str]]] = {}     # genre_id -> [(-score, anime_id)]
+        self._keys: dict[str, tuple[float, tuple[int, ...]]] = {}   # anime_id -> (-score, genre_ids)
+        # Во время with_updates(): жанры, списки которых уже скопированы у индекса-родителя (copy-on-write)
+        self._owned: set[int] | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def with_updates(self, entries: Iterable[Tuple[str, dict]]) -> "AnimeGenreIndex":
+        """
+        Новый индекс = текущий + entries. Текущий индекс не меняется: копируются только затронутые жанры.
+        """
+        index = AnimeGenreIndex()
+        index._entries = dict(self._entries)
+        index._postings = dict(self._postings)
+        index._keys = dict(self._keys)
+
+        index._owned = set()
+        index.update(entries)
+        index._owned = None
+        return index
+
+    def _own(self, genre_id: int) -> list[tuple[float, str]]:
+        """Список жанра, который можно менять: общий с родителем список сначала копируется."""
+        postings = self._postings.get(genre_id)
+        if self._owned is None:
+            return postings if postings is not None else self._postings.setdefault(genre_id, [])
+
+        if genre_id not in self._owned:
+            self._owned.add(genre_id)
+            postings = self._postings[genre_id] = list(postings) if postings is not None else []
+        return postings
+
+    # ====== Построение индекса ======
+    def remove(self, anime_id: str) -> None:
+        self._entries.pop(anime_id, None)
+        key = self._keys.pop(anime_id, None)
+        if key is None:
+            return
+
+        neg_score, genre_ids = key
+        for genre_id in genre_ids:
+            if genre_id not in self._postings:
+                continue
+            postings = self._own(genre_id)
+            i = bisect.bisect_left(postings, (neg_score, anime_id))
+            if i < len(postings) and postings[i] == (neg_score, anime_id):
+                del postings[i]
+
+    def update(self, entries: Iterable[Tuple[str, dict]]) -> None:
+        """Добавляет или переиндексирует записи (anime_id, anime)."""
+        batch: dict[str, dict] = {}
+        for anime_id, anime in entries:
+            if not isinstance(anime, dict):
+                logger.error(f"[AnimeGenreIndex] - Запись {anime_id} не является словарём: {repr(anime)}")
+                continue
+            batch[str(anime_id)] = anime
+
+        # Сначала убираем старые записи — пока списки отсортированы и bisect в remove() корректен
+        for anime_id in batch:
+            self.remove(anime_id)
+
+        touched = set()
+
+        for anime_id, anime in batch.items():
+            genre_ids = tuple({
+                GENRES[name.lower()] for name in anime.get("genres") or []
+                if isinstance(name, str) and name.lower() in GENRES
+            })
+            neg_score = -_score(anime)
+
+            self._entries[anime_id] = anime
+            self._keys[anime_id] = (neg_score, genre_ids)
+
+            for genre_id in genre_ids:
+                self._own(genre_id).append((neg_score, anime_id))
+                touched.add(genre_id)
+
+        # Сортируем один раз на пакет, а не вставкой на каждую запись
+        for genre_id in touched:
+            self._postings[genre_id].sort()
+
+    # ====== Выборка ======
+    def pool_size(self, genre_id: int, min_score: float = 0) -> int:
+        """Сколько аниме жанра genre_id имеют оценку не ниже min_score."""
+        postings = self._postings.get(genre_id, [])
+        return bisect.bisect_right(postings, (-min_score, "￿"))
+
+    def sample(self, genre_id: int, min_score: float = 0, limit: int = 10) -> list[dict]:
+        """
+        Случайные limit аниме жанра с оценкой не ниже min_score, отсортированные по убыванию оценки.
+        """
+        postings = self._postings.get(genre_id, [])
+        pool = postings[:self.pool_size(genre_id, min_score)]
+        picked = sorted(random.sample(pool, k=min(limit, len(pool))))
+        return [self._entries[anime_id] for _, anime_id in picked]
@@ -0,0 +1,189 @@
+import heapq
+import re
+from typing import Iterable, Tuple
+
+from _configs.log_config import logger
+
+
+NGRAM_SIZE = 3                  # Длина n-граммы инвертированного индекса
+SHORT_PREFIX_MAX_LEN = NGRAM_SIZE - 1   # Запросы короче n-граммы ищутся по префиксам слов
+
+# Качество совпадения: чем меньше, тем выше в выдаче
+MATCH_EXACT = 0
+MATCH_TITLE_PREFIX = 1
+MATCH_WORD_PREFIX = 2
+MATCH_SUBSTRING = 3
+
+
+def normalize_title(text: str) -> str:
+    """Приводит название к виду для поиска: нижний регистр, ё → е, всё кроме букв и цифр → одиночный пробел."""
+    if not text:
+        return ""
+    text = text.lower().replace("ё", "е")
+    return " ".join(re.split(r"[\W_]+", text)).strip()
+
+
+def _ngrams(text: str) -> set[str]:
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def _score(anime: dict) -> float:
+    try:
+        return float(anime.get("score") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class AnimeSearchIndex:
+    """
+    Инвертированный индекс по названиям аниме (russian и name).
+
+    Запросы длиной от NGRAM_SIZE символов ищутся пересечением списков n-грамм с проверкой подстроки,
+    более короткие — по префиксам слов. Результаты ранжируются по качеству совпадения, затем по оценке.
+    Индекс обновляется инкрементально через update()/remove(), а with_updates() строит новый индекс
+    поверх текущего, не меняя его (для неизменяемых снимков кэша).
+    """
+
+    def __init__(self):
+        self._entries: dict[str, dict] = {}
+        self._titles: dict[str, tuple[str, ...]] = {}
+        self._ngrams: dict[str, set[str]] = {}
+        self._prefixes: dict[str, set[str]] = {}
+        # Во время with_updates(): ключи списков, уже скопированных у индекса-родителя (copy-on-write)
+        self._owned: set[tuple[int, str]] | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def with_updates(self, entries: Iterable[Tuple[str, dict]]) -> "AnimeSearchIndex":
+        """
+        Новый индекс = текущий + entries. Текущий индекс не меняется: верхние словари копируются поверхностно,
+        а списки аниме копируются, только когда их затрагивают изменения.
+        """
+        index = AnimeSearchIndex()
+        index._entries = dict(self._entries)
+        index._titles = dict(self._titles)
+        index._ngrams = dict(self._ngrams)
+        index._prefixes = dict(self._prefixes)
+
+        index._owned = set()
+        index.update(entries)
+        index._owned = None
+        return index
+
+    def _own(self, postings: dict[str, set[str]], key: str) -> set[str]:
+        """Список postings[key], который можно менять: общий с родителем список сначала копируется."""
+        ids = postings.get(key)
+        if self._owned is None:
+            return ids if ids is not None else postings.setdefault(key, set())
+
+        if (id(postings), key) not in self._owned:
+            self._owned.add((id(postings), key))
+            ids = postings[key] = set(ids) if ids is not None else set()
+        return ids
+
+    # ====== Построение индекса ======
+    @staticmethod
+    def _keys_for(titles: tuple[str, ...]) -> Tuple[set[str], set[str]]:
+        grams = set()
+        prefixes = set()
+        for title in titles:
+            grams |= _ngrams(title)
+            for word in title.split():
+                for length in range(1, min(SHORT_PREFIX_MAX_LEN, len(word)) + 1):
+                    prefixes.add(word[:length])
+        return grams, prefixes
+
+    def remove(self, anime_id: str) -> None:
+        titles = self._titles.pop(anime_id, None)
+        self._entries.pop(anime_id, None)
+        if titles is None:
+            return
+
+        grams, prefixes = self._keys_for(titles)
+        for postings, keys in ((self._ngrams, grams), (self._prefixes, prefixes)):
+            for key in keys:
+                if key in postings:
+                    ids = self._own(postings, key)
+                    ids.discard(anime_id)
+                    if not ids:
+                        del postings[key]
+                        if self._owned is not None:
+                            self._owned.discard((id(postings), key))
+
+    def update(self, entries: Iterable[Tuple[str, dict]]) -> None:
+        """Добавляет или переиндексирует записи (anime_id, anime)."""
+        for anime_id, anime in entries:
+            if not isinstance(anime, dict):
+                logger.error(f"[AnimeSearchIndex] - Запись {anime_id} не является словарём: {repr(anime)}")
+                continue
+
+            anime_id = str(anime_id)
+            self.remove(anime_id)
+
+            titles = tuple(
+                title for title in {normalize_title(anime.get("russian")), normalize_title(anime.get("name"))} if title
+            )
+
+            self._entries[anime_id] = anime
+            self._titles[anime_id] = titles
+
+            grams, prefixes = self._keys_for(titles)
+            for postings, keys in ((self._ngrams, grams), (self._prefixes, prefixes)):
+                for key in keys:
+                    self._own(postings, key).add(anime_id)
+
+    # ====== Поиск ======
+    def _candidates(self, query: str) -> set[str]:
+        if len(query) <= SHORT_PREFIX_MAX_LEN:
+            return self._prefixes.get(query, set())
+
+        postings = []
+        for gram in _ngrams(query):
+            ids = self._ngrams.get(gram)
+            if not ids:
+                return set()
+            postings.append(ids)
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates &= ids
+            if not candidates:
+                break
+        return candidates
+
+    @staticmethod
+    def _match_quality(query: str, titles: tuple[str, ...]) -> int | None:
+        best = None
+        for title in titles:
+            if title == query:
+                return MATCH_EXACT
+            if title.startswith(query):
+                quality = MATCH_TITLE_PREFIX
+            elif f" {query}" in f" {title}":
+                quality = MATCH_WORD_PREFIX
+            elif query in title:
+                quality = MATCH_SUBSTRING
+            else:
+                continue
+            best = quality if best is None else min(best, quality)
+        return best
+
+    def search(self, query: str, limit: int = 50) -> list[dict]:
+        """
+        Возвращает до limit аниме, подходящих под запрос, по убыванию качества совпадения и оценки.
+        """
+        query = normalize_title(query)
+        if not query:
+            return []
+
+        ranked = []
+        for anime_id in self._candidates(query):
+            quality = self._match_quality(query, self._titles[anime_id])
+            if quality is None:
+                continue
+            anime = self._entries[anime_id]
+            ranked.append((quality, -_score(anime), anime_id))
+
+        return [self._entries[anime_id] for _, _, anime_id in heapq.nsmallest(limit, ranked)]
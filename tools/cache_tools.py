@@ -1,18 +1,20 @@
 import asyncio
-from typing import List, Tuple
+from types import MappingProxyType
+from typing import List, Mapping, Tuple
 
 from database.anime_cache_repository import AnimeCacheRepository
-import json
-import os
+from database.local_anime_cache_store import get_local_anime_cache_store
 from _configs.config import get_config
 from _configs.log_config import logger
+from tools.anime_genre_index import AnimeGenreIndex
+from tools.anime_search_index import AnimeSearchIndex
 
 
 cfg = get_config()
-ANIME_CACHE_PATH = cfg.cache_config.anime_cache_path
 
-_cache_data = None
-_last_mtime = 0
+SNAPSHOT_REFRESH_INTERVAL = cfg.cache_config.anime_cache_snapshot_refresh_interval
+
+_refresh_lock = asyncio.Lock()
 
 
 async def cache_anime_list(
@@ -20,17 +22,18 @@ async def cache_anime_list(
     repository: AnimeCacheRepository
 ) -> None:
     """
-    Асинхронно сохраняет список аниме-данных в Supabase через AnimeCacheRepository.
+    Асинхронно сохраняет список аниме-данных в Supabase через AnimeCacheRepository одним пакетным upsert.
 
     :param anime_entries: Список кортежей (anime_id, anime_entry)
     :param repository: Экземпляр AnimeCacheRepository
     """
-    for anime_id, anime_entry in anime_entries:
-        try:
-            await repository.add_anime_cache(anime_id, anime_entry)
-            logger.debug(f"[cache_anime_list] ✅ Сохранено в БД: {anime_id}")
-        except Exception as e:
-            logger.warning(f"[cache_anime_list] ❌ Ошибка сохранения ID {anime_id} в БД\n{e}")
+    try:
+        if await repository.add_anime_cache_many(anime_entries):
+            logger.debug(f"[cache_anime_list] ✅ Сохранено в БД: {[anime_id for anime_id, _ in anime_entries]}")
+        else:
+            logger.warning(f"[cache_anime_list] ❌ Пакет из {len(anime_entries)} аниме не сохранён в БД")
+    except Exception as e:
+        logger.warning(f"[cache_anime_list] ❌ Ошибка пакетного сохранения {len(anime_entries)} аниме в БД\n{e}")
 
 
 def cache_anime_list_in_background(
@@ -50,22 +53,120 @@ def cache_anime_list_in_background(
         logger.error(f"[cache_anime_list_in_background] ❌ Ошибка запуска фоновой задачи\n{e}")
 
 
-def get_anime_cache():
-    global _cache_data, _last_mtime
+class AnimeCacheSnapshot:
+    """
+    Неизменяемый снимок локального аниме кэша вместе с производными представлениями:
+    поисковым индексом по названиям, индексом по жанрам и пулом для случайной выборки.
 
-    try:
+    Снимок строится в отдельном потоке и подменяется одной операцией присваивания,
+    поэтому читатели в event loop никогда не ждут разбора данных и не видят полуобновлённое состояние.
+    Новый снимок выводится из предыдущего (with_changes): индексы переиндексируют только изменённые записи.
+    """
+
+    def __init__(
+        self,
+        entries: dict[str, dict],
+        version: int,
+        search_index: AnimeSearchIndex = None,
+        genre_index: AnimeGenreIndex = None
+    ):
+        self.version = version
+        self.entries = MappingProxyType(entries)
+        self.sample_pool = tuple(entries.values())
+
+        if search_index is None:
+            search_index = AnimeSearchIndex()
+            search_index.update(entries.items())
+        self.search_index = search_index
+
+        if genre_index is None:
+            genre_index = AnimeGenreIndex()
+            genre_index.update(entries.items())
+        self.genre_index = genre_index
+
+    def with_changes(self, changes: dict[str, dict], version: int) -> "AnimeCacheSnapshot":
+        """
+        Новый снимок = текущий + changes. Текущий снимок не меняется (его могут читать обработчики).
+        """
+        entries = dict(self.entries)
+        entries.update(changes)
+        return AnimeCacheSnapshot(
+            entries,
+            version,
+            search_index=self.search_index.with_updates(changes.items()),
+            genre_index=self.genre_index.with_updates(changes.items())
+        )
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+_snapshot = AnimeCacheSnapshot({}, version=0)
+
+
+def _build_snapshot(current: AnimeCacheSnapshot) -> AnimeCacheSnapshot:
+    """
+    Выполняется в отдельном потоке: подтягивает записи, изменённые после current.version,
+    и строит новый снимок. Если изменений нет — возвращает current.
+    """
+    entries, seq = get_local_anime_cache_store().load_since(current.version)
+    if not entries:
+        return current
+
+    changes = dict(entries)
+    if not current.entries:
+        snapshot = AnimeCacheSnapshot(changes, version=seq)
+    else:
+        snapshot = current.with_changes(changes, version=seq)
+
+    logger.info(f"[AnimeCacheSnapshot] - Новый снимок: {len(changes)} изменённых записей, всего {len(snapshot)} "
+                f"(seq {current.version} -> {seq})")
+    return snapshot
 
-        mtime = os.path.getmtime(ANIME_CACHE_PATH)
-        logger.debug(f"[get_anime_cache] -> Проверка времени изменения файла, текущее время изменения файла {mtime}")
-        if _cache_data is None or mtime > _last_mtime:
-            with open(ANIME_CACHE_PATH, "r", encoding="utf-8") as f:
-                _cache_data = json.load(f)
-                _last_mtime = mtime
-                logger.info(f"[get_anime_cache] -> Обновление файла. Замечено изменение времени обновления файла {_last_mtime}")
-        logger.info(f"[get_anime_cache] - Кэш успешно обновлен после нового запроса")
-    except Exception as e:
-        logger.error(f"[get_anime_cache] - Не удалось загрузить кеш: {e}")
-        _cache_data = {}
 
-    logger.debug(f"[get_anime_cache] - Выдача кэша")
-    return _cache_data
\ No newline at end of file
+async def refresh_anime_cache_snapshot() -> AnimeCacheSnapshot:
+    """
+    Пересобирает снимок кэша вне event loop и атомарно подменяет текущий.
+    """
+    global _snapshot
+
+    async with _refresh_lock:
+        _snapshot = await asyncio.to_thread(_build_snapshot, _snapshot)
+    return _snapshot
+
+
+async def run_anime_cache_snapshot_refresher() -> None:
+    """
+    Фоновая задача: раз в SNAPSHOT_REFRESH_INTERVAL проверяет хранилище на изменения и при необходимости
+    пересобирает снимок.
+    """
+    while True:
+        try:
+            await refresh_anime_cache_snapshot()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[AnimeCacheSnapshot] - ❌ Не удалось обновить снимок кэша: {e}")
+
+        await asyncio.sleep(SNAPSHOT_REFRESH_INTERVAL)
+
+
+def get_anime_cache_snapshot() -> AnimeCacheSnapshot:
+    """
+    Возвращает текущий снимок кэша. Снимок не меняется — для согласованных чтений берите его один раз на запрос.
+    """
+    return _snapshot
+
+
+def get_anime_cache() -> Mapping[str, dict]:
+    """
+    Возвращает read-only словарь {anime_id: anime_entry} из текущего снимка кэша.
+    """
+    return _snapshot.entries
+
+
+def get_anime_genre_index() -> AnimeGenreIndex:
+    """
+    Возвращает индекс "жанр → аниме по убыванию оценки" из текущего снимка кэша.
+    """
+    return _snapshot.genre_index
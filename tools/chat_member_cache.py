@@ -0,0 +1,54 @@
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+
+from _configs.config import get_config
+from tools.single_flight import SingleFlight
+from tools.ttl_cache import TTLCache
+
+cfg = get_config()
+
+GROUP_ID = cfg.bot_config.group_id
+MEMBER_CACHE_TTL = cfg.bot_config.member_cache_ttl
+MEMBER_CACHE_MAX_SIZE = cfg.bot_config.member_cache_max_size
+
+MEMBER_STATUSES = ("member", "administrator", "creator")
+
+
+class ChatMemberCache:
+    """
+    Кэш проверки участия в группе (по аналогии с AccessLevelCache).
+    Избавляет inline-запросы от вызова get_chat_member на каждое нажатие клавиши.
+    Инвалидируется обновлениями chat_member (вступление/выход).
+    """
+
+    def __init__(self, chat_id: int):
+        self._chat_id = chat_id
+        self._cache = TTLCache(ttl=MEMBER_CACHE_TTL, max_size=MEMBER_CACHE_MAX_SIZE)
+        # Одновременные промахи по одному пользователю делят один запрос, разные пользователи друг друга не ждут
+        self._single_flight = SingleFlight()
+
+    async def is_member(self, bot: Bot, user_id: int) -> bool:
+        cached = self._cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        return await self._single_flight.do(user_id, lambda: self._fetch(bot, user_id))
+
+    async def _fetch(self, bot: Bot, user_id: int) -> bool:
+        try:
+            member = await bot.get_chat_member(chat_id=self._chat_id, user_id=user_id)
+            is_member = member.status in MEMBER_STATUSES
+        except TelegramBadRequest:
+            is_member = False
+
+        self._cache.set(user_id, is_member)
+        return is_member
+
+    def invalidate(self, user_id: int):
+        self._cache.invalidate(user_id)
+
+    def clear(self):
+        self._cache.clear()
+
+
+chat_member_cache = ChatMemberCache(GROUP_ID)
@@ -2,6 +2,7 @@ from data.cities import city_list
 import dotenv
 from aiogram.exceptions import TelegramBadRequest
 from aiogram import F
+import aiohttp
 import asyncio
 from googletrans import Translator
 from datetime import datetime
@@ -14,6 +15,7 @@ from functools import wraps
 from aiogram import types
 from database.repositories import get_users_data_repository
 from _configs.config import get_config
+from api.kodik_api.kodik_client import KodikResponse, get_kodik_client
 import re
 from itertools import product
 from typing import Set, Tuple, Optional
@@ -229,24 +231,28 @@ def get_player_url(kodik_link: str) -> str:
     return f'https://ero-no-sekai.up.railway.app/watch/?url=https:{kodik_link}'
 
 
-def get_kodik_response(shikimori_id: Optional[str | int]) -> requests.Response:
+async def get_kodik_response(shikimori_id: Optional[str | int]) -> KodikResponse:
     """
     Функция запроса к KodikAPI, которая возвращает Response объект для дальнейших манипуляций.
+    Запрос идёт через общий асинхронный KodikClient (один пул соединений на процесс).
     *Обратите внимание, url-строка включает в себя KodikAPI Token получаемый из Config(cfg) объекта.
 
     :param shikimori_id: ID аниме по Shikimori.one
-    :return: Response объект
+    :return: KodikResponse объект (status_code == 0, если KodikAPI недоступен)
     """
-    url = f"https://kodikapi.com/search?token={cfg.web_app_config.kodik_token}&shikimori_id={shikimori_id}"
-    response = requests.get(url)
+    try:
+        response = await get_kodik_client().search(shikimori_id=shikimori_id)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"[get_kodik_data] - KodikAPI недоступен для shikimori_id={shikimori_id}: {e!r}")
+        return KodikResponse(0, "")
 
     try:
         data = response.json()
         results = data.get("results", [])
         if response.status_code == 200 and not results:
             logger.warning(
-                f"[get_kodik_data] - Вернул 0 элементов по запросу shikimori_id={shikimori_id} "
-                f"(url={url})\nПолученный массив: {json.dumps(data, indent=4, ensure_ascii=False)}"
+                f"[get_kodik_data] - Вернул 0 элементов по запросу shikimori_id={shikimori_id}"
+                f"\nПолученный массив: {json.dumps(data, indent=4, ensure_ascii=False)}"
             )
     except Exception as e:
         logger.error(
@@ -257,24 +263,24 @@ def get_kodik_response(shikimori_id: Optional[str | int]) -> requests.Response:
     return response
 
 
-def get_kodik_data_for_site(shikimori_id: Optional[str | int] = None,
-                            kinopoisk_id: Optional[str | int] = None
-                            ):
+async def get_kodik_data_for_site(shikimori_id: Optional[str | int] = None,
+                                  kinopoisk_id: Optional[str | int] = None
+                                  ):
     """
-    Функция запроса к KodikAPI, которая возвращает Response объект для дальнейших манипуляций.
+    Функция запроса к KodikAPI, которая возвращает первый найденный результат для страницы плеера.
+    Запрос идёт через общий асинхронный KodikClient (один пул соединений на процесс).
     *Обратите внимание, url-строка включает в себя KodikAPI Token получаемый из Config(cfg) объекта.
 
     :param shikimori_id: ID аниме по Shikimori.one
-    :param kinopoisk_id: ID фильма\сериала из Кинопоиска
+    :param kinopoisk_id: ID фильма\\сериала из Кинопоиска
     :return: data
     """
-    if shikimori_id:
-        url = f"https://kodikapi.com/search?token={cfg.web_app_config.kodik_token}&shikimori_id={shikimori_id}"
-    elif kinopoisk_id:
-        url = f"https://kodikapi.com/search?token={cfg.web_app_config.kodik_token}&kinopoisk_id={kinopoisk_id}"
-
-
-    response = requests.get(url)
+    try:
+        response = await get_kodik_client().search(shikimori_id=shikimori_id, kinopoisk_id=kinopoisk_id)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"[get_kodik_data] - KodikAPI недоступен (shikimori_id={shikimori_id}, "
+                     f"kinopoisk_id={kinopoisk_id}): {e!r}")
+        return None
 
     try:
         data = response.json()
@@ -282,7 +288,7 @@ def get_kodik_data_for_site(shikimori_id: Optional[str | int] = None,
         if response.status_code == 200 and not results:
             logger.warning(
                 f"[get_kodik_data] - Вернул 0 элементов по запросу shikimori_id={shikimori_id} "
-                f"(url={url})\nПолученный массив: {json.dumps(data, indent=4, ensure_ascii=False)}"
+                f"kinopoisk_id={kinopoisk_id}\nПолученный массив: {json.dumps(data, indent=4, ensure_ascii=False)}"
             )
     except Exception as e:
         logger.error(
@@ -291,7 +297,7 @@ def get_kodik_data_for_site(shikimori_id: Optional[str | int] = None,
         )
         return None
 
-    return data['results'][0]
+    return results[0] if results else None
 
 
 logger.info("[Utils] - Зарегистрирован успешно")
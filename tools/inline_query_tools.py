@@ -15,7 +15,7 @@ def clean_description(text: str) -> str:
 def safe_join(items):
     return ', '.join([item if isinstance(item, str) else item.get('russian', 'Не указано') for item in items]) or 'Не указаны'
 
-def build_anime_caption(anime: dict):
+async def build_anime_caption(anime: dict):
     description = clean_description(anime.get("description", "Описание отсутствует."))
     if len(description) > 300:
         description = description[:300] + "..."
@@ -37,7 +37,7 @@ def build_anime_caption(anime: dict):
     )
 
 
-    result = get_kodik_response(anime_id)
+    result = await get_kodik_response(anime_id)
     if result.status_code == 200:
         try:
             markup = InlineKeyboardMarkup(inline_keyboard=[
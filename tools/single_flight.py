@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых одновременных запросов (single-flight).
+
+    Пока запрос с ключом key выполняется, остальные вызовы с тем же ключом не создают новый,
+    а ждут результат уже идущего. После завершения ключ освобождается — кэширования здесь нет.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        self._waiters: dict[Hashable, int] = {}
+        self.shared = 0     # Сколько вызовов получили чужой результат
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.shared += 1
+        else:
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda _, k=key: self._forget(k))
+
+        self._waiters[key] += 1
+        try:
+            # shield: отмена одного ожидающего не должна отменять запрос для остальных
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Запрос отменяется, только когда его результат больше никому не нужен
+            if self._in_flight.get(key) is task and self._waiters[key] == 1:
+                task.cancel()
+            raise
+        finally:
+            if key in self._waiters and self._in_flight.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: Hashable) -> None:
+        self._in_flight.pop(key, None)
+        self._waiters.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Асинхронный token bucket: не более rate запросов в секунду с допустимым всплеском capacity.
+
+    Ожидающие обслуживаются по очереди (FIFO). pause() останавливает выдачу токенов всем —
+    используется, когда сервер прислал 429 с Retry-After.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+        self.waiting = 0            # Текущая глубина очереди
+        self.max_waiting = 0
+        self.acquired = 0
+        self.total_wait = 0.0       # Суммарное время ожидания токенов, сек.
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        started_at = time.monotonic()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+
+                    delay = self._paused_until - now
+                    if delay <= 0:
+                        if self._tokens >= 1:
+                            self._tokens -= 1
+                            break
+                        delay = (1 - self._tokens) / self._rate
+
+                    await asyncio.sleep(delay)
+        finally:
+            self.waiting -= 1
+
+        self.acquired += 1
+        self.total_wait += time.monotonic() - started_at
+
+    def pause(self, seconds: float) -> None:
+        """Не выдавать токены ближайшие seconds секунд (продлевает, но не сокращает текущую паузу)."""
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._tokens = 0.0
+        self._updated_at = now
+
+    def stats(self) -> dict:
+        return {
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "acquired": self.acquired,
+            "avg_wait": round(self.total_wait / self.acquired, 3) if self.acquired else 0.0,
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 3)
+        }
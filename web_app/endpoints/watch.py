@@ -26,10 +26,10 @@ async def show_iframe(request: Request):
     title_type = ""
 
     if shiki_id:
-        kodik_anime_data = get_kodik_data_for_site(shikimori_id=shiki_id)
+        kodik_anime_data = await get_kodik_data_for_site(shikimori_id=shiki_id)
         title_type = "аниме"
     elif kp_id:
-        kodik_anime_data = get_kodik_data_for_site(kinopoisk_id=kp_id)
+        kodik_anime_data = await get_kodik_data_for_site(kinopoisk_id=kp_id)
         title_type = "фильм"
 
     if not kodik_anime_data: